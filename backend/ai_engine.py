@@ -1,15 +1,32 @@
 import os
+import hashlib
+import threading
+import time
 from mistralai import Mistral
 from dotenv import load_dotenv
+from .metrics import Metrics
+from .prompt_builder import PromptBuilder
 
 load_dotenv()
 
+CHAT_MODEL = "mistral-large-latest"
+SYSTEM_PROMPT = ("1. You are a Senior Engineer."
+    "2. Strictly stick to the code base related queries."
+    "3. Do not respond the Outside questions. If the outside query is asked, respond something like I have no context regarding this query."
+    "4. Answer using the code and dependency context provided.")
+
 class SeniorEngineerAI:
-    def __init__(self):
-        api_key = os.getenv("MISTRAL_API_KEY")
-        self.client = Mistral(api_key=api_key) if api_key else None
+    def __init__(self, client=None, db=None, context_budget=6000):
+        if client is None:
+            api_key = os.getenv("MISTRAL_API_KEY")
+            client = Mistral(api_key=api_key) if api_key else None
+        self.client = client
+        self.db = db
+        self.metrics = db.metrics if db else Metrics()
+        self.prompts = PromptBuilder(context_budget)
+        self._db_lock = threading.Lock()
 
-    def summarize_function(self, code, name):
+    def summarize_function(self, code, name, raise_errors=False):
         if not self.client: return None
         try:
             res = self.client.chat.complete(
@@ -17,23 +34,45 @@ class SeniorEngineerAI:
                 messages=[{"role": "user", "content": f"Summarize this function '{name}' in one sentence. Code: {code[:1500]}..."}]
             )
             return res.choices[0].message.content
-        except: return None
+        except Exception:
+            if raise_errors: raise
+            return None
 
-    def ask_with_context(self, user_query, context):
+    # Answers come from the response cache when the same question was asked about the
+    # same context before; with stream=True a generator of text chunks is returned.
+    def ask_with_context(self, user_query, context, stream=False):
         if not self.client: return "AI Not Configured."
-        deps = "\n".join([f"- {d['name']}: {d['summary']}" for d in context['dependencies']])
-        prompt = f"""TARGET: {context['target']['code']}
-DEPS: {deps}
-QUESTION: {user_query}"""
-        
-        res = self.client.chat.complete(
-            model="mistral-large-latest",
-            messages=[
-                {"role": "system", "content": "1. You are a Senior Engineer."
-                "2. Strictly stick to the code base related queries."
-                "3. Do not respond the Outside questions. If the outside query is asked, respond something like I have no context regarding this query."
-                "4. Answer using the code and dependency context provided."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return res.choices[0].message.content
+        prompt = self.prompts.build(context, user_query)
+        key = hashlib.sha1(f"{context['target'].get('id')}\0{CHAT_MODEL}\0{prompt}".encode('utf-8')).hexdigest()
+        cached = self._cached(key)
+        self.metrics.count("chat.cache_hits" if cached is not None else "chat.cache_misses")
+        if cached is not None: return iter([cached]) if stream else cached
+
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}]
+        if stream: return self._stream(key, messages)
+        start = time.perf_counter()
+        res = self.client.chat.complete(model=CHAT_MODEL, messages=messages)
+        self.metrics.observe("chat.latency", time.perf_counter() - start)
+        answer = res.choices[0].message.content
+        self._store(key, answer)
+        return answer
+
+    def _stream(self, key, messages):
+        parts = []
+        start = time.perf_counter()
+        for event in self.client.chat.stream(model=CHAT_MODEL, messages=messages):
+            chunk = event.data.choices[0].delta.content
+            if chunk:
+                if not parts: self.metrics.observe("chat.first_token", time.perf_counter() - start)
+                parts.append(chunk)
+                yield chunk
+        self.metrics.observe("chat.latency", time.perf_counter() - start)
+        self._store(key, "".join(parts))
+
+    def _cached(self, key):
+        if not self.db: return None
+        return self.db.get_cached_response(key)
+
+    def _store(self, key, answer):
+        if not self.db or not answer: return
+        with self._db_lock: self.db.cache_response(key, answer)
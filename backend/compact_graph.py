@@ -0,0 +1,131 @@
+from array import array
+from bisect import bisect_left
+
+STRING_COLUMNS = ('name', 'type', 'file_path', 'docstring', 'summary', 'last_updated')
+INT_COLUMNS = ('start_line', 'end_line', 'version')
+
+class StringTable:
+    def __init__(self):
+        self.strings = [None]
+        self.index = {None: 0}
+
+    def intern(self, value):
+        i = self.index.get(value)
+        if i is None:
+            i = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return i
+
+    def __getitem__(self, i):
+        return self.strings[i]
+
+class _NodeView:
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, node_id):
+        return self._graph.node_attrs(self._graph.index[node_id])
+
+    def __call__(self, data=False):
+        g = self._graph
+        if not data: return iter(g.ids)
+        return ((node_id, g.node_attrs(i)) for i, node_id in enumerate(g.ids))
+
+    def __iter__(self):
+        return iter(self._graph.ids)
+
+    def __len__(self):
+        return len(self._graph.ids)
+
+# Read-only call graph held in flat arrays: integer node ids, interned attribute
+# strings and CSR (out) / CSC (in) adjacency. Exposes the subset of the networkx
+# DiGraph interface that GraphService uses, so either can back it.
+class CompactGraph:
+    def __init__(self, node_rows, edge_rows):
+        self.strings = StringTable()
+        self.ids = []
+        self.index = {}
+        self.has_row = array('b')
+        self.columns = {c: array('i') for c in STRING_COLUMNS + INT_COLUMNS}
+
+        for row in node_rows:
+            i = self._add_node(row['id'])
+            self.has_row[i] = 1
+            for c in STRING_COLUMNS: self.columns[c][i] = self.strings.intern(row[c])
+            for c in INT_COLUMNS: self.columns[c][i] = row[c] or 0
+
+        sources, targets, types = array('i'), array('i'), array('i')
+        for e in edge_rows:
+            sources.append(self._add_node(e['source_id']))
+            targets.append(self._add_node(e['target_id']))
+            types.append(self.strings.intern(e['type']))
+
+        self.out_offsets, self.out_targets, self.out_types = self._pack(sources, targets, types)
+        self.in_offsets, self.in_sources, self.in_types = self._pack(targets, sources, types)
+        self.nodes = _NodeView(self)
+
+    def _add_node(self, node_id):
+        i = self.index.get(node_id)
+        if i is None:
+            i = self.index[node_id] = len(self.ids)
+            self.ids.append(node_id)
+            self.has_row.append(0)
+            for column in self.columns.values(): column.append(0)
+        return i
+
+    def _pack(self, keys, values, types):
+        n = len(self.ids)
+        order = sorted(range(len(keys)), key=lambda k: (keys[k], values[k]))
+        offsets = array('i', [0]) * (n + 1)
+        for k in keys: offsets[k + 1] += 1
+        for i in range(n): offsets[i + 1] += offsets[i]
+        return offsets, array('i', (values[k] for k in order)), array('i', (types[k] for k in order))
+
+    def node_attrs(self, i):
+        if not self.has_row[i]: return {}
+        attrs = {'id': self.ids[i]}
+        for c in STRING_COLUMNS: attrs[c] = self.strings[self.columns[c][i]]
+        for c in INT_COLUMNS: attrs[c] = self.columns[c][i]
+        return attrs
+
+    def __contains__(self, node_id):
+        return node_id in self.index
+
+    def has_node(self, node_id):
+        return node_id in self.index
+
+    def number_of_nodes(self):
+        return len(self.ids)
+
+    def number_of_edges(self):
+        return len(self.out_targets)
+
+    def successors(self, node_id):
+        i = self.index[node_id]
+        return (self.ids[t] for t in self.out_targets[self.out_offsets[i]:self.out_offsets[i + 1]])
+
+    def predecessors(self, node_id):
+        i = self.index[node_id]
+        return (self.ids[s] for s in self.in_sources[self.in_offsets[i]:self.in_offsets[i + 1]])
+
+    def get_edge_data(self, u, v, default=None):
+        i, j = self.index.get(u), self.index.get(v)
+        if i is None or j is None: return default
+        lo, hi = self.out_offsets[i], self.out_offsets[i + 1]
+        k = bisect_left(self.out_targets, j, lo, hi)
+        if k == hi or self.out_targets[k] != j: return default
+        return {'type': self.strings[self.out_types[k]]}
+
+    # Like networkx: degree(node) is an int, degree() yields (node, degree) for every node.
+    def degree(self, node_id=None):
+        out, into = self.out_offsets, self.in_offsets
+        if node_id is None:
+            return ((n, out[i + 1] - out[i] + into[i + 1] - into[i]) for i, n in enumerate(self.ids))
+        i = self.index[node_id]
+        return out[i + 1] - out[i] + into[i + 1] - into[i]
+
+    def edges(self, data=False):
+        for i, node_id in enumerate(self.ids):
+            for k in range(self.out_offsets[i], self.out_offsets[i + 1]):
+                target = self.ids[self.out_targets[k]]
+                yield (node_id, target, {'type': self.strings[self.out_types[k]]}) if data else (node_id, target)
@@ -1,15 +1,226 @@
 import sqlite3
 import os
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.request import pathname2url
+from .metrics import Metrics
 
 DB_PATH = "data/owlset.db"
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,
+    "temp_store": "MEMORY",
+}
 
+READ_POOL_SIZE = 8
+
+NODE_COLUMNS = "id, name, type, file_path, start_line, end_line, docstring, summary, last_updated, version"
+UNSUMMARIZED = "type = 'function' AND (summary IS NULL OR summary = '')"
+
+def _create_search_index(conn):
+    try:
+        conn.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS nodes_fts
+            USING fts5(name, file_path, summary, content='nodes', tokenize='trigram')""")
+    except sqlite3.OperationalError:
+        return  # No FTS5 trigram tokenizer in this SQLite build; search falls back to LIKE.
+    conn.execute("""CREATE TRIGGER IF NOT EXISTS nodes_fts_insert AFTER INSERT ON nodes BEGIN
+        INSERT INTO nodes_fts(rowid, name, file_path, summary) VALUES (new.rowid, new.name, new.file_path, new.summary);
+    END""")
+    conn.execute("""CREATE TRIGGER IF NOT EXISTS nodes_fts_delete AFTER DELETE ON nodes BEGIN
+        INSERT INTO nodes_fts(nodes_fts, rowid, name, file_path, summary) VALUES ('delete', old.rowid, old.name, old.file_path, old.summary);
+    END""")
+    conn.execute("""CREATE TRIGGER IF NOT EXISTS nodes_fts_update AFTER UPDATE OF name, file_path, summary ON nodes BEGIN
+        INSERT INTO nodes_fts(nodes_fts, rowid, name, file_path, summary) VALUES ('delete', old.rowid, old.name, old.file_path, old.summary);
+        INSERT INTO nodes_fts(rowid, name, file_path, summary) VALUES (new.rowid, new.name, new.file_path, new.summary);
+    END""")
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS nodes_fts_vocab USING fts5vocab(nodes_fts, 'row')")
+    conn.execute("INSERT INTO nodes_fts(nodes_fts) VALUES ('rebuild')")
+
+# Applied in order and recorded in PRAGMA user_version. A step is a list of
+# statements or a callable taking the connection.
+MIGRATIONS = [
+    [
+        "ALTER TABLE nodes ADD COLUMN version INTEGER DEFAULT 0",
+        "ALTER TABLE edges ADD COLUMN version INTEGER DEFAULT 0",
+        """CREATE TABLE IF NOT EXISTS tombstones (
+            kind TEXT,
+            source_id TEXT,
+            target_id TEXT,
+            type TEXT,
+            version INTEGER
+        )""",
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)",
+        "INSERT OR IGNORE INTO meta VALUES ('generation', 0), ('floor', 0)",
+        "CREATE INDEX IF NOT EXISTS idx_nodes_version ON nodes(version)",
+        "CREATE INDEX IF NOT EXISTS idx_edges_version ON edges(version)",
+        "CREATE INDEX IF NOT EXISTS idx_tombstones_version ON tombstones(version)",
+    ],
+    _create_search_index,
+    [
+        "CREATE INDEX IF NOT EXISTS idx_edges_target ON edges(target_id, type)",
+        "CREATE INDEX IF NOT EXISTS idx_nodes_name ON nodes(name)",
+        # Exact and prefix lookups in search_functions (forced with INDEXED BY).
+        "CREATE INDEX IF NOT EXISTS idx_nodes_name_nocase ON nodes(name COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_nodes_type_name ON nodes(type, name, id)",
+        "CREATE INDEX IF NOT EXISTS idx_nodes_file_path ON nodes(file_path)",
+        f"CREATE INDEX IF NOT EXISTS idx_nodes_unsummarized ON nodes(id) WHERE {UNSUMMARIZED}",
+        "CREATE INDEX IF NOT EXISTS idx_calls_caller ON calls(caller_id)",
+        "CREATE INDEX IF NOT EXISTS idx_calls_name ON calls(name)",
+        "CREATE INDEX IF NOT EXISTS idx_calls_file_path ON calls(file_path)",
+    ],
+    [
+        "ALTER TABLE calls ADD COLUMN receiver TEXT",
+        "CREATE TABLE IF NOT EXISTS imports (file_path TEXT, alias TEXT, module TEXT, name TEXT)",
+        "CREATE INDEX IF NOT EXISTS idx_imports_file_path ON imports(file_path)",
+        # Methods are now keyed as file::Class.method; invalidate the manifest so every file is re-parsed.
+        "UPDATE files SET size = -1, hash = NULL",
+    ],
+    [
+        # Link queue: files and names touched by a scan, expanded to the callers to re-link.
+        # Kept on disk so linking a whole repository stays out of memory and survives a crash.
+        "CREATE TABLE IF NOT EXISTS link_files (path TEXT PRIMARY KEY)",
+        "CREATE TABLE IF NOT EXISTS link_names (name TEXT PRIMARY KEY)",
+        "CREATE TABLE IF NOT EXISTS link_callers (caller_id TEXT PRIMARY KEY)",
+    ],
+    [
+        "CREATE TABLE IF NOT EXISTS response_cache (prompt_hash TEXT PRIMARY KEY, response TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)",
+    ],
+]
+
+# Read-only connections lent to one thread at a time. Under WAL they read while the
+# writer commits, so dashboard sessions queue neither behind a scan nor each other.
+class ConnectionPool:
+    def __init__(self, db_path, size=READ_POOL_SIZE):
+        self.uri = f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+        self.size = size
+        self.created = 0
+        self.idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for key in ("cache_size", "temp_store"):
+            conn.execute(f"PRAGMA {key}={PRAGMAS[key]}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = self.created < self.size
+                if grow: self.created += 1
+            if not grow: conn = self.idle.get()
+            else:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock: self.created -= 1
+                    raise
+        try:
+            yield conn
+        finally:
+            self.idle.put(conn)
+
+    def close(self):
+        while True:
+            try: self.idle.get_nowait().close()
+            except queue.Empty: return
+
+# `conn` is the single writer. Reads that the dashboard and background threads issue go
+# through the pool instead, except on the thread inside a session, which must see its own
+# uncommitted writes. read_pool_size=0 sends everything through `conn`.
 class DatabaseManager:
-    def __init__(self):
-        os.makedirs("data", exist_ok=True)
-        self.conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    def __init__(self, db_path=DB_PATH, metrics=None, read_pool_size=READ_POOL_SIZE):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.metrics = metrics or Metrics()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        for key, value in PRAGMAS.items():
+            self.conn.execute(f"PRAGMA {key}={value}")
+        self._session_depth = 0
+        self._session_generation = None
+        self._session_owner = None
+        self._local = threading.local()
         self._init_schema()
+        self._migrate()
+        self.has_search_index = bool(self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'nodes_fts'").fetchone())
+        self.readers = ConnectionPool(db_path, read_pool_size) if read_pool_size else None
+
+    def close(self):
+        if self.readers: self.readers.close()
+        self.conn.close()
+
+    @contextmanager
+    def _reader(self):
+        pinned = getattr(self._local, 'conn', None)
+        if pinned is not None:
+            yield pinned
+        elif self.readers is None or (self._session_depth and self._session_owner == threading.get_ident()):
+            yield self.conn
+        else:
+            with self.readers.connection() as conn: yield conn
+
+    # Pins one pooled connection to this thread inside a read transaction, so a series of
+    # reads (a GraphService refresh) sees a single committed state of the index.
+    @contextmanager
+    def snapshot(self):
+        if getattr(self._local, 'conn', None) is not None:
+            yield self
+            return
+        with self._reader() as conn:
+            if conn is self.conn:
+                yield self
+                return
+            conn.execute("BEGIN")
+            self._local.conn = conn
+            try:
+                yield self
+            finally:
+                self._local.conn = None
+                conn.rollback()
+
+    @contextmanager
+    def session(self):
+        if not self._session_depth: self._session_owner = threading.get_ident()
+        self._session_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._session_depth -= 1
+            if not self._session_depth:
+                self._session_generation = self._session_owner = None
+                self.conn.rollback()
+            raise
+        self._session_depth -= 1
+        if not self._session_depth:
+            self._session_generation = self._session_owner = None
+            with self.metrics.timer("db.commit"): self.conn.commit()
+
+    def _commit(self):
+        if self._session_depth: return
+        with self.metrics.timer("db.commit"): self.conn.commit()
+
+    def _generation(self):
+        if self._session_generation is not None: return self._session_generation
+        self.conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+        generation = self.conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+        if self._session_depth: self._session_generation = generation
+        return generation
+
+    def _read(self, sql, params=()):
+        with self._reader() as conn: return conn.execute(sql, params).fetchall()
+
+    def get_generation(self):
+        rows = dict(self._read("SELECT key, value FROM meta"))
+        return rows['generation'], rows['floor']
 
     def _init_schema(self):
         cursor = self.conn.cursor()
@@ -35,43 +246,331 @@ class DatabaseManager:
             PRIMARY KEY (source_id, target_id, type)
         )
         """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime INTEGER,
+            hash TEXT
+        )
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS calls (
+            caller_id TEXT,
+            name TEXT,
+            file_path TEXT,
+            line INTEGER
+        )
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS summary_cache (
+            code_hash TEXT PRIMARY KEY,
+            summary TEXT
+        )
+        """)
         self.conn.commit()
 
+    def _migrate(self):
+        current = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for version, step in enumerate(MIGRATIONS[current:], start=current + 1):
+            if callable(step): step(self.conn)
+            else:
+                for statement in step:
+                    self.conn.execute(statement)
+            self.conn.execute(f"PRAGMA user_version = {version}")
+            self.conn.commit()
+
+    def reset(self):
+        for table in ('nodes', 'edges', 'files', 'calls', 'imports', 'tombstones', 'link_files', 'link_names', 'link_callers'):
+            self.conn.execute(f"DELETE FROM {table}")
+        self.conn.execute("UPDATE meta SET value = ? WHERE key = 'floor'", (self._generation(),))
+        self._commit()
+
+    def prune_tombstones(self, limit=100000):
+        if self.conn.execute("SELECT COUNT(*) FROM tombstones").fetchone()[0] <= limit: return
+        self.conn.execute("DELETE FROM tombstones")
+        self.conn.execute("UPDATE meta SET value = ? WHERE key = 'floor'", (self._generation(),))
+        self._commit()
+
     def upsert_node(self, node_data):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-        INSERT INTO nodes (id, name, type, file_path, start_line, end_line, code, docstring, last_updated)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        self.upsert_nodes([node_data])
+
+    def upsert_nodes(self, nodes):
+        if not nodes: return
+        now, generation = datetime.now(), self._generation()
+        self.conn.executemany("""
+        INSERT INTO nodes (id, name, type, file_path, start_line, end_line, code, docstring, last_updated, version)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ON CONFLICT(id) DO UPDATE SET
+            version=excluded.version,
+            summary=CASE WHEN nodes.code = excluded.code THEN nodes.summary ELSE NULL END,
             code=excluded.code,
             start_line=excluded.start_line,
             end_line=excluded.end_line,
             last_updated=excluded.last_updated
-        """, (
-            node_data['id'], node_data['name'], node_data['type'], 
-            node_data['file_path'], node_data['start_line'], node_data['end_line'], 
-            node_data['code'], node_data.get('docstring', ''), datetime.now()
-        ))
-        self.conn.commit()
+        """, [(
+            n['id'], n['name'], n['type'],
+            n['file_path'], n['start_line'], n['end_line'],
+            n['code'], n.get('docstring', ''), now, generation
+        ) for n in nodes])
+        self.metrics.count("nodes.written", len(nodes))
+        self._commit()
 
     def add_edge(self, source, target, edge_type):
-        if not source or not target: return
-        cursor = self.conn.cursor()
-        cursor.execute('INSERT OR IGNORE INTO edges VALUES (?, ?, ?)', (source, target, edge_type))
-        self.conn.commit()
+        self.add_edges([(source, target, edge_type)])
+
+    def add_edges(self, edges):
+        rows = [e for e in edges if e[0] and e[1]]
+        if not rows: return
+        generation = self._generation()
+        cursor = self.conn.executemany('INSERT OR IGNORE INTO edges (source_id, target_id, type, version) VALUES (?, ?, ?, ?)',
+                                       [(source, target, edge_type, generation) for source, target, edge_type in rows])
+        self.metrics.count("edges.written", cursor.rowcount)
+        self._commit()
 
     def get_summary(self, node_id):
-        cursor = self.conn.cursor()
-        res = cursor.execute("SELECT summary FROM nodes WHERE id = ?", (node_id,)).fetchone()
-        return res['summary'] if res else None
+        rows = self._read("SELECT summary FROM nodes WHERE id = ?", (node_id,))
+        return rows[0]['summary'] if rows else None
 
     def update_summary(self, node_id, summary):
-        self.conn.execute("UPDATE nodes SET summary = ? WHERE id = ?", (summary, node_id))
-        self.conn.commit()
+        self.update_summaries([(node_id, summary)])
+
+    def update_summaries(self, pairs):
+        if not pairs: return
+        generation = self._generation()
+        self.conn.executemany("UPDATE nodes SET summary = ?, version = ? WHERE id = ?", [(s, generation, i) for i, s in pairs])
+        self._commit()
 
     def get_all_nodes(self):
-        return self.conn.execute("SELECT * FROM nodes").fetchall()
+        return self._read("SELECT * FROM nodes")
 
     def get_edges(self):
-        return self.conn.execute("SELECT * FROM edges").fetchall()
+        return self._read("SELECT * FROM edges")
+
+    def get_function_index(self):
+        return self._read("SELECT id, name FROM nodes WHERE type = 'function'")
+
+    def get_functions_by_name(self, name):
+        return self.conn.execute("SELECT id, file_path FROM nodes WHERE name = ? AND type = 'function'", (name,)).fetchall()
+
+    def get_unsummarized_function_ids(self, file_paths=None):
+        if file_paths is None:
+            return [r['id'] for r in self._read(f"SELECT id FROM nodes INDEXED BY idx_nodes_unsummarized WHERE {UNSUMMARIZED}")]
+        ids = []
+        for chunk in _chunks(list(file_paths)):
+            marks = ",".join("?" * len(chunk))
+            ids += [r['id'] for r in self._read(f"SELECT id FROM nodes WHERE file_path IN ({marks}) AND {UNSUMMARIZED}", chunk)]
+        return ids
+
+    def get_function_sources(self, node_ids):
+        for chunk in _chunks(list(node_ids)):
+            marks = ",".join("?" * len(chunk))
+            yield from self._read(f"SELECT id, name, code FROM nodes WHERE id IN ({marks})", chunk)
+
+    def get_callees(self, node_id):
+        return self._read("""
+        SELECT n.id, n.name, n.file_path, n.summary FROM edges e JOIN nodes n ON n.id = e.target_id
+        WHERE e.source_id = ? AND e.type = 'calls'
+        """, (node_id,))
+
+    def get_callers(self, node_id):
+        return self._read("""
+        SELECT n.id, n.name, n.file_path, n.summary FROM edges e JOIN nodes n ON n.id = e.source_id
+        WHERE e.target_id = ? AND e.type = 'calls'
+        """, (node_id,))
+
+    def get_nodes_since(self, version):
+        return self._read(f"SELECT {NODE_COLUMNS} FROM nodes WHERE version > ?", (version,))
+
+    def get_edges_since(self, version):
+        return self._read("SELECT * FROM edges WHERE version > ?", (version,))
+
+    def get_tombstones_since(self, version):
+        return self._read("SELECT * FROM tombstones WHERE version > ? ORDER BY version", (version,))
+
+    def get_node_code(self, node_id):
+        rows = self._read("SELECT code FROM nodes WHERE id = ?", (node_id,))
+        return rows[0]['code'] if rows else None
+
+    # Streams every node's code grouped by file, for snapshot export.
+    def iter_node_code(self):
+        yield from self.conn.execute("SELECT id, file_path, code FROM nodes WHERE code IS NOT NULL ORDER BY file_path, id")
+
+    def _tombstone_nodes(self, node_ids):
+        generation = self._generation()
+        self.conn.executemany("INSERT INTO tombstones (kind, source_id, version) VALUES ('node', ?, ?)",
+                              [(node_id, generation) for node_id in node_ids])
+
+    def search_functions(self, query, limit=50):
+        query = (query or '').strip()
+        if not query:
+            return self._read("SELECT id, name, file_path FROM nodes WHERE type = 'function' ORDER BY name LIMIT ?", (limit,))
+
+        fetch = int(limit) * 4
+        escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        # Exact names first, then prefixes shortest first, both as ranges on
+        # idx_nodes_name_nocase; a prefix like "get" can match thousands of names.
+        searches = [("name = ?1 COLLATE NOCASE", (query,)),
+                    ("name >= ?1 COLLATE NOCASE AND name < ?2 COLLATE NOCASE", (query, query + '\U0010ffff'))]
+        if self.has_search_index and len(query) >= 3:
+            searches.append(("nodes_fts MATCH ?", (_fts_phrase(query),)))
+            searches.append(("nodes_fts MATCH ?", (self._fuzzy_match(query),)))
+        else:
+            searches.append(("(name LIKE ?1 ESCAPE '\\' OR file_path LIKE ?1 ESCAPE '\\' OR summary LIKE ?1 ESCAPE '\\')",
+                             ('%' + escaped + '%',)))
+
+        candidates = {}
+        for where, params in searches:
+            if not params[0]: continue
+            if where.startswith("nodes_fts"):
+                sql = f"""SELECT n.id, n.name, n.file_path, n.summary, nodes_fts.rank AS score
+                FROM nodes_fts JOIN nodes n ON n.rowid = nodes_fts.rowid
+                WHERE {where} AND n.type = 'function' ORDER BY nodes_fts.rank LIMIT {fetch}"""
+            elif where.startswith("name"):
+                sql = f"""SELECT id, name, file_path, summary, 0 AS score FROM nodes INDEXED BY idx_nodes_name_nocase
+                WHERE {where} AND type = 'function' ORDER BY length(name), name LIMIT {fetch}"""
+            else:
+                sql = f"""SELECT id, name, file_path, summary, 0 AS score FROM nodes
+                WHERE type = 'function' AND {where} LIMIT {fetch}"""
+            for r in self._read(sql, params): candidates.setdefault(r['id'], r)
+            if len(candidates) >= limit: break
+
+        q = query.lower()
+        def tier(r):
+            name = (r['name'] or '').lower()
+            if name == q: return 0
+            if name.startswith(q): return 1
+            if q in name: return 2
+            if q in (r['file_path'] or '').lower() or q in (r['summary'] or '').lower(): return 3
+            return 4
+        ranked = sorted(candidates.values(), key=lambda r: (tier(r), r['score'], len(r['name'] or ''), r['id']))
+        return ranked[:limit]
+
+    def _fuzzy_match(self, query, max_terms=4):
+        # OR the rarest trigrams of the query, so typos still match and ranking favours
+        # names sharing the most distinctive fragments, without scanning every row.
+        grams = list({query[i:i + 3].lower() for i in range(len(query) - 2)})
+        marks = ",".join("?" * len(grams))
+        counts = dict(self._read(f"SELECT term, doc FROM nodes_fts_vocab WHERE term IN ({marks})", grams))
+        present = sorted((g for g in grams if g in counts), key=lambda g: counts[g])[:max_terms]
+        return " OR ".join(_fts_phrase(g) for g in present)
+
+    def get_cached_summaries(self, code_hashes):
+        found = {}
+        for chunk in _chunks(list(code_hashes)):
+            marks = ",".join("?" * len(chunk))
+            rows = self._read(f"SELECT code_hash, summary FROM summary_cache WHERE code_hash IN ({marks})", chunk)
+            found.update((r['code_hash'], r['summary']) for r in rows)
+        return found
+
+    def cache_summaries(self, pairs):
+        self.conn.executemany("INSERT OR REPLACE INTO summary_cache (code_hash, summary) VALUES (?, ?)", pairs)
+        self._commit()
+
+    def get_cached_response(self, prompt_hash):
+        rows = self._read("SELECT response FROM response_cache WHERE prompt_hash = ?", (prompt_hash,))
+        return rows[0]['response'] if rows else None
+
+    def cache_response(self, prompt_hash, response):
+        self.conn.execute("INSERT OR REPLACE INTO response_cache (prompt_hash, response) VALUES (?, ?)", (prompt_hash, response))
+        self._commit()
+
+    def get_manifest(self, paths=None):
+        if paths is None: return {r['path']: r for r in self.conn.execute("SELECT * FROM files").fetchall()}
+        manifest = {}
+        for chunk in _chunks(list(paths)):
+            marks = ",".join("?" * len(chunk))
+            manifest.update((r['path'], r) for r in self.conn.execute(f"SELECT * FROM files WHERE path IN ({marks})", chunk))
+        return manifest
+
+    def update_manifest(self, path, size, mtime, file_hash):
+        self.conn.execute("""
+        INSERT INTO files (path, size, mtime, hash) VALUES (?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET size=excluded.size, mtime=excluded.mtime, hash=excluded.hash
+        """, (path, size, mtime, file_hash))
+        self._commit()
+
+    def get_indexed_files(self):
+        return [r['path'] for r in self.conn.execute("SELECT path FROM files").fetchall()]
+
+    def get_file_nodes(self, file_path):
+        rows = self.conn.execute("SELECT id, name FROM nodes WHERE file_path = ?", (file_path,)).fetchall()
+        return {r['id']: r['name'] for r in rows}
+
+    def delete_nodes(self, node_ids):
+        node_ids = list(node_ids)
+        if not node_ids: return
+        self._tombstone_nodes(node_ids)
+        for chunk in _chunks(node_ids):
+            marks = ",".join("?" * len(chunk))
+            self.conn.execute(f"DELETE FROM edges WHERE source_id IN ({marks}) OR target_id IN ({marks})", chunk + chunk)
+            self.conn.execute(f"DELETE FROM calls WHERE caller_id IN ({marks})", chunk)
+            self.conn.execute(f"DELETE FROM nodes WHERE id IN ({marks})", chunk)
+        self._commit()
+
+    def remove_file(self, file_path):
+        rows = self.conn.execute("SELECT id, name FROM nodes WHERE file_path = ?", (file_path,)).fetchall()
+        self.delete_nodes([r['id'] for r in rows])
+        self._tombstone_nodes([file_path])
+        self.conn.execute("DELETE FROM edges WHERE source_id = ?", (file_path,))
+        self.conn.execute("DELETE FROM calls WHERE file_path = ?", (file_path,))
+        self.conn.execute("DELETE FROM imports WHERE file_path = ?", (file_path,))
+        self.conn.execute("DELETE FROM files WHERE path = ?", (file_path,))
+        self._commit()
+        return {r['name'] for r in rows}
+
+    def replace_calls(self, file_path, calls):
+        self.conn.execute("DELETE FROM calls WHERE file_path = ?", (file_path,))
+        self.conn.executemany("INSERT INTO calls (caller_id, name, file_path, line, receiver) VALUES (?, ?, ?, ?, ?)",
+                              [(c['caller_id'], c['name'], file_path, c['line'], c.get('receiver')) for c in calls])
+        self._commit()
+
+    def replace_imports(self, file_path, imports):
+        self.conn.execute("DELETE FROM imports WHERE file_path = ?", (file_path,))
+        self.conn.executemany("INSERT INTO imports (file_path, alias, module, name) VALUES (?, ?, ?, ?)",
+                              [(file_path, i['alias'], i['module'], i['name']) for i in imports])
+        self._commit()
+
+    def get_imports(self, file_path):
+        return self.conn.execute("SELECT alias, module, name FROM imports WHERE file_path = ?", (file_path,)).fetchall()
+
+    def queue_link(self, file_path=None, names=()):
+        if file_path: self.conn.execute("INSERT OR IGNORE INTO link_files VALUES (?)", (file_path,))
+        self.conn.executemany("INSERT OR IGNORE INTO link_names VALUES (?)", [(n,) for n in names])
+        self._commit()
+
+    def prepare_link(self):
+        self.conn.execute("""
+        INSERT OR IGNORE INTO link_callers SELECT caller_id FROM calls
+        WHERE file_path IN (SELECT path FROM link_files) OR name IN (SELECT name FROM link_names)
+        """)
+        self.conn.execute("""
+        INSERT INTO tombstones (kind, source_id, target_id, type, version)
+        SELECT 'edge', source_id, target_id, type, ? FROM edges
+        WHERE type = 'calls' AND source_id IN (SELECT caller_id FROM link_callers)
+        """, (self._generation(),))
+        self.conn.execute("DELETE FROM edges WHERE type = 'calls' AND source_id IN (SELECT caller_id FROM link_callers)")
+        self._commit()
+        return self.conn.execute("SELECT COUNT(*) FROM link_callers").fetchone()[0]
+
+    def iter_link_calls(self, chunk_size=1000):
+        last = ''
+        while True:
+            callers = [r[0] for r in self.conn.execute(
+                "SELECT caller_id FROM link_callers WHERE caller_id > ? ORDER BY caller_id LIMIT ?", (last, chunk_size))]
+            if not callers: return
+            last = callers[-1]
+            marks = ",".join("?" * len(callers))
+            yield self.conn.execute(f"SELECT * FROM calls WHERE caller_id IN ({marks})", callers).fetchall()
+
+    def clear_link_queue(self):
+        for table in ('link_files', 'link_names', 'link_callers'):
+            self.conn.execute(f"DELETE FROM {table}")
+        self._commit()
+
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
 
+def _chunks(items, size=500):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
@@ -1,55 +1,267 @@
+import os
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 import networkx as nx
 from .database import DatabaseManager
+from .compact_graph import CompactGraph
+from .reachability import DIRECTIONS, ReachabilityIndex, bounded_bfs
 
-class GraphService:
+BACKENDS = ('networkx', 'compact', 'mapped')
+LEVELS = ('function', 'file', 'directory')
+RANKS = ('degree', 'pagerank')
+
+class ReadWriteLock:
     def __init__(self):
-        self.db = DatabaseManager()
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing: self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers: self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            while self._writing or self._readers: self._cond.wait()
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+class GraphService:
+    def __init__(self, db=None, backend='networkx', cache_size=1024, reachability=True):
+        if backend not in BACKENDS: raise ValueError(f"Unknown graph backend: {backend}")
+        self.db = db or DatabaseManager()
+        if backend == 'mapped' and not hasattr(self.db, 'mapped_graph'): raise ValueError("The mapped backend needs a SnapshotStore")
+        self.backend = backend
         self.graph = nx.DiGraph()
+        self.version = None
+        self.lock = ReadWriteLock()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_size = cache_size
+        self.reachability = reachability
+        self._indexes = {}
+        self._index_lock = threading.Lock()
         self.refresh()
 
     def refresh(self):
-        self.graph.clear()
-        nodes = self.db.get_all_nodes()
-        edges = self.db.get_edges()
-        for n in nodes: self.graph.add_node(n['id'], **dict(n))
-        for e in edges: self.graph.add_edge(e['source_id'], e['target_id'], type=e['type'])
+        version, _ = self.db.get_generation()
+        if version == self.version: return False
+        with self.lock.write(), self.db.snapshot(), self.db.metrics.timer("graph.refresh"):
+            changed = self._load()
+            if changed: self._indexes = {}
+        if changed:
+            with self._cache_lock: self._cache.clear()
+        return changed
+
+    def _load(self):
+        version, floor = self.db.get_generation()
+        if version == self.version: return False
+        if self.backend == 'mapped':
+            # A snapshot never changes; its arrays are used in place.
+            self.graph = self.db.mapped_graph()
+            self.version = version
+            return True
+        if self.backend == 'compact':
+            # The arrays are immutable, so any change rebuilds them from the projected rows.
+            self.graph = CompactGraph(self.db.get_nodes_since(-1), self.db.get_edges())
+            self.version = version
+            return True
+        if self.version is None or self.version < floor:
+            self.graph.clear()
+            since = -1
+        else:
+            since = self.version
+            for t in self.db.get_tombstones_since(since):
+                if t['kind'] == 'node':
+                    if t['source_id'] in self.graph: self.graph.remove_node(t['source_id'])
+                elif self.graph.has_edge(t['source_id'], t['target_id']):
+                    self.graph.remove_edge(t['source_id'], t['target_id'])
+
+        for n in self.db.get_nodes_since(since):
+            if n['id'] in self.graph: self.graph.nodes[n['id']].update(dict(n))
+            else: self.graph.add_node(n['id'], **dict(n))
+        for e in self.db.get_edges_since(since): self.graph.add_edge(e['source_id'], e['target_id'], type=e['type'])
+        self.version = version
+        return True
+
+    def get_code(self, node_id):
+        return self.db.get_node_code(node_id)
+
+    def search(self, query, limit=50):
+        return self.db.search_functions(query, limit)
+
+    def get_node(self, node_id):
+        with self.lock.read():
+            return dict(self.graph.nodes[node_id]) if node_id in self.graph else None
 
     def get_context_for_function(self, node_id):
+        return self._cached(node_id, lambda: self._build_context(node_id))
+
+    def _cached(self, key, build):
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.db.metrics.count("graph.cache_hits")
+                return self._cache[key]
+        self.db.metrics.count("graph.cache_misses")
+        version = self.version
+        with self.lock.read():
+            value = build()
+        if self.cache_size and value is not None:
+            with self._cache_lock:
+                if version == self.version:
+                    self._cache[key] = value
+                    if len(self._cache) > self.cache_size: self._cache.popitem(last=False)
+        return value
+
+    # Built on first use after each graph change, one per set of edge types, and only
+    # while callers hold the read lock so the graph cannot move underneath it.
+    def _index(self, edge_types=('calls',)):
+        if not self.reachability: return None
+        key = frozenset(edge_types)
+        with self._index_lock:
+            if key not in self._indexes: self._indexes[key] = ReachabilityIndex(self.graph, key)
+            return self._indexes[key]
+
+    # Only an index that already exists is used here: contexts are on every page view
+    # and must not pay for a whole-graph rebuild after each change.
+    def _neighbors(self, node_id, direction, edge_types=('calls',)):
+        index = self._indexes.get(frozenset(edge_types))
+        if index is not None: return index.neighbors(node_id, direction)
+        if direction == 'callees':
+            return [v for v in self.graph.successors(node_id) if self.graph.get_edge_data(node_id, v).get('type') in edge_types]
+        return [u for u in self.graph.predecessors(node_id) if self.graph.get_edge_data(u, node_id).get('type') in edge_types]
+
+    def _build_context(self, node_id):
         if node_id not in self.graph: return None
         dependencies = []
-        if self.graph.has_node(node_id):
-            for neighbor in self.graph.successors(node_id):
-                if self.graph.get_edge_data(node_id, neighbor).get('type') == 'calls':
-                    n = self.graph.nodes[neighbor]
-                    dependencies.append({"name": n.get('name'), "summary": n.get('summary', 'No summary.'), "file": n.get('file_path')})
-            usages = []
-            for pred in self.graph.predecessors(node_id):
-                if self.graph.get_edge_data(pred, node_id).get('type') == 'calls':
-                    usages.append(self.graph.nodes[pred].get('name'))
-            return {"target": self.graph.nodes[node_id], "dependencies": dependencies, "usages": usages}
-        return None
+        for neighbor in self._neighbors(node_id, 'callees'):
+            n = self.graph.nodes[neighbor]
+            dependencies.append({"name": n.get('name'), "summary": n.get('summary', 'No summary.'),
+                                 "file": n.get('file_path'), "degree": self.graph.degree(neighbor)})
+        usages = [self.graph.nodes[pred].get('name') for pred in self._neighbors(node_id, 'callers')]
+        target = {**self.graph.nodes[node_id], "code": self.get_code(node_id)}
+        return {"target": target, "dependencies": dependencies, "usages": usages}
+
+    # Transitive caller / callee counts. Builds the reachability index on first use after
+    # a change, so it belongs behind an explicit user action, not on every page view.
+    def get_reach(self, node_id):
+        with self.lock.read():
+            if node_id not in self.graph: return None
+            index = self._index()
+            if index is not None: return {direction: index.reach_count(node_id, direction) for direction in DIRECTIONS}
+            return {direction: bounded_bfs(self.graph, node_id, direction)[0] for direction in DIRECTIONS}
+
+    # Transitive callers ('callers') or callees ('callees') of a node up to `depth` hops
+    # (unbounded when None) over the given edge types. `count` covers everything reached;
+    # `nodes` lists the nearest `limit` of them.
+    def traverse(self, node_id, direction='callers', depth=None, edge_types=('calls',), limit=100):
+        if direction not in DIRECTIONS: raise ValueError(f"Unknown direction: {direction}")
+        with self.lock.read():
+            index = self._index(edge_types)
+            if index is not None: count, found = index.traverse(node_id, direction, depth, limit)
+            else: count, found = bounded_bfs(self.graph, node_id, direction, depth, edge_types, limit)
+            nodes = []
+            for n_id, distance in found:
+                attrs = self.graph.nodes[n_id]
+                nodes.append({"id": n_id, "name": attrs.get('name'), "file": attrs.get('file_path'), "distance": distance})
+        return {"count": count, "nodes": nodes}
+
+    def get_impact(self, node_id, depth=None, limit=100):
+        return self.traverse(node_id, 'callers', depth, limit=limit)
     
     def get_full_graph_data(self):
-        nodes = []
-        edges = []
-        
-        valid_nodes = {n for n, attr in self.graph.nodes(data=True) if attr.get('type') == 'function'}
-        
-        for n_id in valid_nodes:
-            attr = self.graph.nodes[n_id]
-            degree = self.graph.degree(n_id)
-            color = "#ff4b4b" if degree > 5 else "#00C851" if degree < 2 else "#33b5e5"
-            
-            nodes.append({
-                "id": n_id,
-                "label": attr.get('name'),
-                "color": color,
-                "title": attr.get('file_path')
-            })
-            
-        for u, v, attr in self.graph.edges(data=True):
-            if u in valid_nodes and v in valid_nodes and attr.get('type') == 'calls':
-                edges.append({"source": u, "target": v})
-                
-        return nodes, edges
+        with self.lock.read():
+            page = self._build_view('function', None, None, 'degree', None)[0]
+        return page['nodes'], page['edges']
+
+    # Level-of-detail view of the call graph. `level` collapses functions into one node
+    # per file or directory with weighted edges; `cluster` expands that one cluster back
+    # into its functions. Nodes are ordered by `rank`, optionally cut to `top_k`, and
+    # split into pages whose edges only point at nodes on the same or earlier pages.
+    def get_graph_view(self, level='function', cluster=None, top_k=None, rank='degree', page=0, page_size=2000):
+        pages = self._view(level, cluster, top_k, rank, page_size)
+        if page < len(pages): return pages[page]
+        return {"page": page, "pages": len(pages), "total_nodes": 0, "nodes": [], "edges": []}
+
+    def iter_graph_view(self, level='function', cluster=None, top_k=None, rank='degree', page_size=2000):
+        yield from self._view(level, cluster, top_k, rank, page_size)
+
+    def _view(self, level, cluster, top_k, rank, page_size):
+        if level not in LEVELS: raise ValueError(f"Unknown level: {level}")
+        if rank not in RANKS: raise ValueError(f"Unknown rank: {rank}")
+        key = ('view', level, cluster, top_k, rank, page_size)
+        return self._cached(key, lambda: self._build_view(level, cluster, top_k, rank, page_size))
+
+    def _call_edges(self):
+        index = self._indexes.get(frozenset(('calls',)))
+        if index is not None:
+            ids = index.ids
+            return ((ids[i], ids[j]) for i, targets in enumerate(index.adj['callees']) for j in targets)
+        return ((u, v) for u, v, attr in self.graph.edges(data=True) if attr.get('type') == 'calls')
+
+    def _build_view(self, level, cluster, top_k, rank, page_size):
+        degree = dict(self.graph.degree())
+        if rank == 'pagerank':
+            index = self._index() or ReachabilityIndex(self.graph)
+            score = dict(zip(index.ids, index.pagerank()))
+        else: score = degree
+
+        attrs = {n: a for n, a in self.graph.nodes(data=True) if a.get('type') == 'function'}
+        if level == 'function': group = {n: n for n in attrs}
+        else:
+            cluster_of = (lambda path: path) if level == 'file' else (lambda path: os.path.dirname(path) or '.')
+            group = {}
+            for n, a in attrs.items():
+                c = cluster_of(a.get('file_path') or '')
+                group[n] = n if c == cluster else c
+
+        members, total_score, total_degree = Counter(group.values()), Counter(), Counter()
+        for n, g in group.items():
+            total_score[g] += score.get(n, 0)
+            total_degree[g] += degree.get(n, 0)
+        weights, internal = Counter(), Counter()
+        for u, v in self._call_edges():
+            if u not in group or v not in group: continue
+            a, b = group[u], group[v]
+            if a == b and a not in attrs: internal[a] += 1
+            else: weights[(a, b)] += 1
 
+        order = sorted(members, key=lambda g: (-total_score[g], g))
+        if cluster and level != 'function':
+            # Drilling down: top-K picks among the expanded functions; the other clusters stay as context.
+            expanded = [g for g in order if g in attrs]
+            order = (expanded[:top_k] if top_k else expanded) + [g for g in order if g not in attrs]
+        elif top_k: order = order[:top_k]
+        position = {g: i for i, g in enumerate(order)}
+        page_size = page_size or max(1, len(order))
+        pages = [{"page": p, "pages": 0, "total_nodes": len(order), "nodes": [], "edges": []}
+                 for p in range(max(1, -(-len(order) // page_size)))]
+        for g in order:
+            per_function = total_degree[g] / members[g]
+            color = "#ff4b4b" if per_function > 5 else "#00C851" if per_function < 2 else "#33b5e5"
+            if g in attrs: node = {"id": g, "label": attrs[g].get('name'), "color": color, "title": attrs[g].get('file_path')}
+            else:
+                node = {"id": g, "label": os.path.basename(g) or g, "color": color, "cluster": True, "size": members[g],
+                        "title": f"{g}: {members[g]} functions, {internal[g]} internal calls"}
+            pages[position[g] // page_size]["nodes"].append(node)
+        for (a, b), weight in weights.items():
+            if a in position and b in position:
+                pages[max(position[a], position[b]) // page_size]["edges"].append({"source": a, "target": b, "weight": weight})
+        for page in pages: page["pages"] = len(pages)
+        return pages
@@ -0,0 +1,107 @@
+import cProfile
+import heapq
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+SLOWEST_FILES = 20
+
+def percentile(sorted_values, q):
+    if not sorted_values: return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+# Stage timers, counters, latency samples and the slowest files of one run. Cheap
+# enough to leave on everywhere; components create their own when none is passed in.
+class Metrics:
+    def __init__(self):
+        self.timers = {}
+        self.counters = Counter()
+        self.samples = {}
+        self.slowest = []
+        self.extra = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            total, calls = self.timers.get(name, (0.0, 0))
+            self.timers[name] = (total + seconds, calls + 1)
+
+    def count(self, name, n=1):
+        with self._lock: self.counters[name] += n
+
+    def observe(self, name, value):
+        with self._lock: self.samples.setdefault(name, []).append(value)
+
+    def record_file(self, path, seconds, size):
+        with self._lock:
+            item = (seconds, path, size)
+            if len(self.slowest) < SLOWEST_FILES: heapq.heappush(self.slowest, item)
+            else: heapq.heappushpop(self.slowest, item)
+
+    def seconds(self, name):
+        return self.timers.get(name, (0.0, 0))[0]
+
+    def report(self):
+        with self._lock:
+            stages = {name: {"seconds": round(total, 6), "calls": calls} for name, (total, calls) in sorted(self.timers.items())}
+            latencies = {}
+            for name, values in sorted(self.samples.items()):
+                values = sorted(values)
+                latencies[name] = {"count": len(values), "p50": percentile(values, 0.5), "p90": percentile(values, 0.9),
+                                   "p99": percentile(values, 0.99), "max": values[-1]}
+            parse = self.seconds("scan.parse")
+            rates = {}
+            if parse:
+                rates["files_per_second"] = self.counters["files.parsed"] / parse
+                rates["bytes_per_second"] = self.counters["bytes.parsed"] / parse
+            link = self.seconds("link")
+            if link: rates["calls_resolved_per_second"] = self.counters["calls.considered"] / link
+            return {
+                "stages": stages, "counters": dict(sorted(self.counters.items())), "rates": rates, "latency": latencies,
+                "slowest_files": [{"path": p, "seconds": round(s, 6), "bytes": b} for s, p, b in sorted(self.slowest, reverse=True)],
+                **self.extra
+            }
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+# Optional cProfile / tracemalloc around a block; results land in the metrics report
+# (and the raw profile in `profile_path` for snakeviz / pstats).
+@contextmanager
+def profiled(metrics, profile_path=None, trace_memory=False, top=25):
+    profiler = cProfile.Profile() if profile_path else None
+    if trace_memory: tracemalloc.start()
+    if profiler: profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            os.makedirs(os.path.dirname(profile_path) or ".", exist_ok=True)
+            profiler.dump_stats(profile_path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+            metrics.extra["profile"] = {"path": profile_path, "top": out.getvalue().splitlines()}
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            metrics.extra["memory"] = {"peak_bytes": peak, "top": [
+                {"where": str(stat.traceback[0]), "bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:top]]}
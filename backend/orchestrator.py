@@ -1,63 +1,225 @@
 import os
+import time
+import hashlib
+import itertools
+import multiprocessing
 from .database import DatabaseManager
 from .parser_engine import CodeParser
-from .resolver import Linker
+from .resolver import CONSTRUCTORS, Linker
+
+IGNORED_DIRS = {'node_modules', '.git', 'dist', 'build', 'coverage', '.next', '__pycache__', 'venv'}
+SOURCE_EXTENSIONS = ('.js', '.jsx', '.ts', '.tsx', '.py')
+LINK_BATCH_SIZE = 5000
+PARSE_WINDOW = 32
+# Files indexed per transaction in a scan. A commit (an fsync under WAL) per file was a
+# third of the writer's time; a crash loses at most this many files' work, and their
+# manifest entries with it, so the next scan redoes them.
+SCAN_COMMIT_FILES = 64
+
+def discover(repo_path):
+    file_paths = []
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+        for file in files:
+            if file.startswith('.'): continue
+            if file.endswith(SOURCE_EXTENSIONS):
+                file_paths.append(os.path.join(root, file))
+    return file_paths
+
+# The same rules as discover(), for one repository-relative path.
+def is_source(rel_path):
+    *dirs, file = rel_path.split(os.sep)
+    return (not file.startswith('.') and file.endswith(SOURCE_EXTENSIONS)
+            and '..' not in dirs and not IGNORED_DIRS.intersection(dirs))
+
+def file_digest(full_path):
+    h = hashlib.sha1()
+    with open(full_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def load_file(parser, full_path, repo_path, known_hash=None):
+    start = time.perf_counter()
+    digest = file_digest(full_path)
+    if digest == known_hash: return digest, None, time.perf_counter() - start
+    data = parser.parse_file(full_path, repo_path)
+    if data: data.pop('raw_code', None)
+    return digest, data, time.perf_counter() - start
+
+_worker_parser = None
+
+def _init_worker():
+    global _worker_parser
+    _worker_parser = CodeParser()
+
+def _load_job(job):
+    return load_file(_worker_parser, *job)
 
 class RepositoryOrchestrator:
-    def __init__(self, repo_path):
+    def __init__(self, repo_path, db=None):
         self.repo_path = repo_path
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager()
         self.parser = CodeParser()
         self.linker = Linker(self.db)
 
-    def scan(self):
+    def discover(self):
+        return discover(self.repo_path)
+
+    def _load_all(self, jobs, workers):
+        if workers <= 1 or len(jobs) < 2:
+            for job in jobs:
+                yield load_file(self.parser, *job)
+            return
+        # Feed the pool one window at a time so parsed files never pile up ahead of the writer.
+        window = max(PARSE_WINDOW, workers * 8)
+        chunksize = max(1, min(64, window // (workers * 8)))
+        with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+            for start in range(0, len(jobs), window):
+                yield from pool.imap(_load_job, jobs[start:start + window], chunksize)
+
+    def scan(self, full=False, workers=1):
         print(f"Scanning Repository: {self.repo_path}")
-        IGNORED_DIRS = {'node_modules', '.git', 'dist', 'build', 'coverage', '.next', '__pycache__', 'venv'}
-        
-        file_paths = []
-        for root, dirs, files in os.walk(self.repo_path):
-            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
-            for file in files:
-                if file.startswith('.'): continue
-                if file.endswith(('.js', '.jsx', '.ts', '.tsx', '.py')):
-                    file_paths.append(os.path.join(root, file))
+        if full:
+            print("   Full rebuild requested, clearing index.")
+            self.db.reset()
 
+        metrics = self.db.metrics
+        with metrics.timer("scan.discover"): file_paths = self.discover()
         total = len(file_paths)
+        metrics.count("files.discovered", total)
         print(f"   Found {total} source files.")
 
-        file_map = {}
-        for i, full_path in enumerate(file_paths):
+        manifest = self.db.get_manifest()
+        seen = set()
+        pending = []
+        for full_path in file_paths:
             rel_path = os.path.relpath(full_path, self.repo_path)
-            print(f"   [{i+1}/{total}] Parsing: {rel_path}", end='\r')
-            
-            data = self.parser.parse_file(full_path, self.repo_path)
-            if not data: continue
-            
-            file_map[rel_path] = data
-            for func in data['definitions']:
-                node_id = f"{rel_path}::{func['name']}"
-                self.db.upsert_node({
-                    "id": node_id, "name": func['name'], "type": "function",
-                    "file_path": rel_path, "start_line": func['start'],
-                    "end_line": func['end'], "code": func['code']
-                })
-                self.db.add_edge(rel_path, node_id, "defines")
-
-        print(f"\nParsing Complete.")
-        
+            seen.add(rel_path)
+            stat = os.stat(full_path)
+            entry = manifest.get(rel_path)
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns: continue
+            pending.append((rel_path, full_path, stat, entry['hash'] if entry else None))
+
+        workers = workers or os.cpu_count() or 1
+        if workers > 1: print(f"   Parsing {len(pending)} candidates with {workers} workers.")
+        metrics.count("files.candidates", len(pending))
+        parsed = 0
+        jobs = [(full_path, self.repo_path, known_hash) for _, full_path, _, known_hash in pending]
+        # scan.parse is wall time for the whole parse/index loop; scan.index is the writer's share of it.
+        with metrics.timer("scan.parse"):
+            loaded = enumerate(self._load_all(jobs, workers))
+            for batch in iter(lambda: list(itertools.islice(loaded, SCAN_COMMIT_FILES)), []):
+                with metrics.timer("scan.index"), self.db.session():
+                    for i, (digest, data, seconds) in batch:
+                        rel_path, _, stat, known_hash = pending[i]
+                        if digest != known_hash:
+                            print(f"   [{i+1}/{len(pending)}] Parsing: {rel_path}", end='\r')
+                            self._record_parse(rel_path, stat, seconds, data)
+                            if not data: continue
+                            parsed += 1
+                        else: metrics.count("files.unchanged")
+                        self._apply(rel_path, stat, digest, data)
+
+        for rel_path in set(manifest) - seen:
+            print(f"   Removed: {rel_path}")
+            metrics.count("files.removed")
+            with self.db.session():
+                self.db.queue_link(names=self.db.remove_file(rel_path))
+
+        print(f"\nParsing Complete. {parsed} changed, {total - parsed} unchanged.")
+
         print("Linking Dependencies...")
-        global_map = {}
-        for row in self.db.get_all_nodes():
-            if row['type'] == 'function':
-                if row['name'] not in global_map: global_map[row['name']] = []
-                global_map[row['name']].append(row['id'])
-
-        for rel_path, data in file_map.items():
-            for func_def in data['definitions']:
-                caller_id = f"{rel_path}::{func_def['name']}"
-                for call in data['calls']:
-                    if func_def['start'] <= call['line'] <= func_def['end']:
-                        target_id = self.linker.match_call(rel_path, call['name'], global_map)
-                        if target_id:
-                            self.db.add_edge(caller_id, target_id, "calls")
+        self.link()
+        with metrics.timer("scan.prune"): self.db.prune_tombstones()
         print("Graph Built.")
+
+    # Re-indexes just the given repository-relative paths (created, modified or deleted)
+    # and re-links, all in one transaction, so readers see the old graph or the new one.
+    # Returns the paths whose contents actually changed.
+    def update(self, rel_paths):
+        manifest = self.db.get_manifest(rel_paths)
+        changed = set()
+        with self.db.session():
+            for rel_path in sorted(rel_paths):
+                full_path = os.path.join(self.repo_path, rel_path)
+                known_hash = manifest[rel_path]['hash'] if rel_path in manifest else None
+                try:
+                    stat = os.stat(full_path) if os.path.isfile(full_path) else None
+                    if stat: digest, data, seconds = load_file(self.parser, full_path, self.repo_path, known_hash)
+                except FileNotFoundError:
+                    stat = None  # deleted between the change being seen and being read
+                if not stat:
+                    if rel_path in manifest:
+                        self.db.queue_link(names=self.db.remove_file(rel_path))
+                        changed.add(rel_path)
+                    continue
+                if digest != known_hash:
+                    self._record_parse(rel_path, stat, seconds, data)
+                    if not data: continue
+                    changed.add(rel_path)
+                self._apply(rel_path, stat, digest, data)
+            if changed: self.link()
+        return changed
+
+    def _record_parse(self, rel_path, stat, seconds, data):
+        metrics = self.db.metrics
+        metrics.count("files.parsed" if data else "files.failed")
+        metrics.count("bytes.parsed", stat.st_size)
+        metrics.record_file(rel_path, seconds, stat.st_size)
+
+    def _apply(self, rel_path, stat, digest, data):
+        if data: self.db.queue_link(rel_path, self._index_file(rel_path, data))
+        self.db.update_manifest(rel_path, stat.st_size, stat.st_mtime_ns, digest)
+
+    def _index_file(self, rel_path, data):
+        old_ids = self.db.get_file_nodes(rel_path)
+        new_ids = {}
+        nodes = []
+        for func in data['definitions']:
+            node_id = f"{rel_path}::{func['qualname']}"
+            new_ids[node_id] = func['name']
+            nodes.append({
+                "id": node_id, "name": func['name'], "type": "function",
+                "file_path": rel_path, "start_line": func['start'],
+                "end_line": func['end'], "code": func['code']
+            })
+        calls = [{"caller_id": f"{rel_path}::{call['caller']}", "name": call['name'],
+                  "line": call['line'], "receiver": call['receiver']}
+                 for call in data['calls'] if call['caller']]
+
+        self.db.upsert_nodes(nodes)
+        self.db.add_edges([(rel_path, node_id, "defines") for node_id in new_ids])
+        self.db.delete_nodes([node_id for node_id in old_ids if node_id not in new_ids])
+        self.db.replace_calls(rel_path, calls)
+        self.db.replace_imports(rel_path, data['imports'])
+        changed = old_ids.keys() ^ new_ids.keys()
+        names = {old_ids.get(i) or new_ids.get(i) for i in changed}
+        # `Foo()` links to Foo.__init__ / Foo.constructor, so its callers are found by the class name.
+        for node_id in changed:
+            *scope, name = node_id.split("::", 1)[1].split(".")
+            if name in CONSTRUCTORS and scope: names.add(scope[-1])
+        return names
+
+    # Re-links every caller queued during the scan, reading the calls back from the
+    # database in bounded chunks rather than holding them in memory.
+    def link(self):
+        with self.db.metrics.timer("link"): self._link()
+        stats = self.linker.stats
+        for outcome, n in stats.items(): self.db.metrics.count(f"calls.{outcome}", n)
+        self.db.metrics.count("calls.considered", sum(stats.values()))
+        print(f"   {stats['resolved']} calls linked, {stats['ambiguous']} ambiguous and {stats['unresolved']} unresolved dropped.")
+
+    def _link(self):
+        self.linker.prepare()
+        self.db.prepare_link()
+        batch = []
+        for calls in self.db.iter_link_calls():
+            for call in calls:
+                target_id = self.linker.resolve(call)
+                if target_id: batch.append((call['caller_id'], target_id, "calls"))
+            if len(batch) >= LINK_BATCH_SIZE:
+                self.db.add_edges(batch)
+                batch = []
+        self.db.add_edges(batch)
+        self.db.clear_link_queue()
@@ -1,8 +1,15 @@
+import re
 from tree_sitter import Language, Parser
 import tree_sitter_python
 import tree_sitter_javascript
 import tree_sitter_typescript
 
+FUNCTION_TYPES = ('function_definition', 'function_declaration', 'method_definition', 'arrow_function')
+CLASS_TYPES = ('class_definition', 'class_declaration', 'abstract_class_declaration', 'class')
+CALL_TYPES = ('call', 'call_expression')
+IMPORT_TYPES = ('import_statement', 'import_from_statement')
+RECEIVER = re.compile(r'^[A-Za-z_$][\w$]*(\.[A-Za-z_$][\w$]*)*$')
+
 class CodeParser:
     def __init__(self):
         self.langs = {
@@ -12,11 +19,23 @@ class CodeParser:
             'tsx': Language(tree_sitter_typescript.language_tsx(), "tsx")
         }
         self.parsers = {}
+        self.queries = {}
         for name, lang in self.langs.items():
             p = Parser()
             p.set_language(lang)
             self.parsers[name] = p
-    
+            self.queries[name] = self._build_query(lang)
+
+    # One query capturing every node kind the extractor cares about, restricted to the
+    # kinds this grammar actually has; matching runs in C instead of a Python tree walk.
+    def _build_query(self, lang):
+        kinds = []
+        for kind in FUNCTION_TYPES + CLASS_TYPES + CALL_TYPES + IMPORT_TYPES:
+            try: lang.query(f"({kind}) @node")
+            except NameError: continue
+            kinds.append(f"({kind})")
+        return lang.query(f"[{' '.join(kinds)}] @node")
+
     def _get_lang_type(self, filepath):
         if filepath.endswith('.py'): return 'python'
         if filepath.endswith(('.js', '.jsx', '.mjs', '.cjs')): return 'javascript'
@@ -28,44 +47,123 @@ class CodeParser:
         lang_type = self._get_lang_type(filepath)
         if not lang_type: return None
 
-        with open(filepath, 'r', encoding='utf-8') as f:
-            code = f.read()
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                code = f.read()
+        except UnicodeDecodeError:
+            return None  # not UTF-8 text; counted as a failed file
 
+        src = bytes(code, "utf8")
         try:
-            tree = self.parsers[lang_type].parse(bytes(code, "utf8"))
+            tree = self.parsers[lang_type].parse(src)
         except Exception as e:
             return None
         
         definitions = []
         calls = []
-        self._traverse(tree.root_node, code, definitions, calls)
-        return {"definitions": definitions, "calls": calls, "raw_code": code}
+        imports = []
+        self._traverse(tree.root_node, src, self.queries[lang_type], definitions, calls, imports)
+        return {"definitions": definitions, "calls": calls, "imports": imports, "raw_code": code}
 
-    def _traverse(self, node, code, definitions, calls):
-        if node.type in ['function_definition', 'function_declaration', 'method_definition', 'arrow_function']:
-            func_name = "anonymous"
-            name_node = node.child_by_field_name('name')
-            if not name_node and node.parent and node.parent.type == 'variable_declarator':
-                name_node = node.parent.child_by_field_name('name')
-            if not name_node and node.type == 'method_definition':
+    # Captured nodes come back in document order; a stack of the enclosing function and
+    # class ranges gives each one its scope without recursing over the tree.
+    def _traverse(self, root, src, query, definitions, calls, imports):
+        text = lambda n: src[n.start_byte:n.end_byte].decode('utf8', 'replace')
+        nodes = sorted((n for n, _ in query.captures(root)), key=lambda n: (n.start_byte, -n.end_byte))
+        stack = [(root.end_byte + 1, None, None)]
+        for node in nodes:
+            while node.start_byte >= stack[-1][0]: stack.pop()
+            _, scope, cls = stack[-1]
+            kind = node.type
+            if kind in FUNCTION_TYPES:
+                name_node = node.child_by_field_name('name')
+                if not name_node and node.parent and node.parent.type == 'variable_declarator':
+                    name_node = node.parent.child_by_field_name('name')
+                if name_node:
+                    func_name = text(name_node)
+                    scope = f"{cls}.{func_name}" if cls else func_name
+                    definitions.append({
+                        'name': func_name, 'qualname': scope, 'class': cls, 'start': node.start_point[0] + 1,
+                        'end': node.end_point[0] + 1, 'code': text(node)
+                    })
+                stack.append((node.end_byte, scope, None))
+            elif kind in CLASS_TYPES:
                 name_node = node.child_by_field_name('name')
+                stack.append((node.end_byte, scope, text(name_node) if name_node else None))
+            elif kind in IMPORT_TYPES:
+                self._collect_imports(node, src, imports)
+            else:
+                self._collect_call(node, src, scope, calls, imports)
 
-            if name_node:
-                func_name = code[name_node.start_byte:name_node.end_byte]
-                definitions.append({
-                    'name': func_name, 'start': node.start_point[0] + 1,
-                    'end': node.end_point[0] + 1, 'code': code[node.start_byte:node.end_byte]
-                })
+    def _collect_call(self, node, src, scope, calls, imports):
+        text = lambda n: src[n.start_byte:n.end_byte].decode('utf8', 'replace')
+        func_node = node.child_by_field_name('function')
+        if not func_node: return
+        if func_node.type == 'attribute' or func_node.type == 'member_expression':
+            prop = func_node.child_by_field_name('attribute') or func_node.child_by_field_name('property')
+            if prop:
+                obj = func_node.child_by_field_name('object')
+                receiver = text(obj) if obj else None
+                if receiver and not RECEIVER.match(receiver): receiver = '?'
+                calls.append({'name': text(prop), 'line': node.start_point[0]+1, 'caller': scope, 'receiver': receiver})
+        elif func_node.type == 'identifier':
+            func_name = text(func_node)
+            calls.append({'name': func_name, 'line': node.start_point[0]+1, 'caller': scope, 'receiver': None})
+            if func_name == 'require': self._collect_require(node, src, imports)
 
-        if node.type in ['call_expression', 'call']:
-            func_node = node.child_by_field_name('function')
-            if func_node:
-                if func_node.type == 'attribute' or func_node.type == 'member_expression':
-                    prop = func_node.child_by_field_name('attribute') or func_node.child_by_field_name('property')
-                    if prop:
-                        calls.append({'name': code[prop.start_byte:prop.end_byte], 'line': node.start_point[0]+1})
-                elif func_node.type == 'identifier':
-                    calls.append({'name': code[func_node.start_byte:func_node.end_byte], 'line': node.start_point[0]+1})
+    def _collect_imports(self, node, src, imports):
+        text = lambda n: src[n.start_byte:n.end_byte].decode('utf8', 'replace')
+        source = node.child_by_field_name('source')
+        if source:
+            module = text(source)[1:-1]
+            clause = next((c for c in node.children if c.type == 'import_clause'), None)
+            for child in (clause.children if clause else []):
+                if child.type == 'identifier':
+                    imports.append({'alias': text(child), 'module': module, 'name': 'default'})
+                elif child.type == 'namespace_import':
+                    alias = next((c for c in child.children if c.type == 'identifier'), None)
+                    if alias: imports.append({'alias': text(alias), 'module': module, 'name': None})
+                elif child.type == 'named_imports':
+                    for spec in child.children:
+                        if spec.type != 'import_specifier': continue
+                        name = spec.child_by_field_name('name')
+                        alias = spec.child_by_field_name('alias') or name
+                        imports.append({'alias': text(alias), 'module': module, 'name': text(name)})
+        elif node.type == 'import_statement':
+            for child in node.children_by_field_name('name'):
+                if child.type == 'aliased_import':
+                    module = text(child.child_by_field_name('name'))
+                    imports.append({'alias': text(child.child_by_field_name('alias')), 'module': module, 'name': None})
+                else:
+                    imports.append({'alias': text(child), 'module': text(child), 'name': None})
+        else:
+            module_node = node.child_by_field_name('module_name')
+            if not module_node: return
+            module = text(module_node)
+            if any(c.type == 'wildcard_import' for c in node.children):
+                imports.append({'alias': '*', 'module': module, 'name': '*'})
+            for child in node.children_by_field_name('name'):
+                if child.type == 'aliased_import':
+                    name = text(child.child_by_field_name('name'))
+                    imports.append({'alias': text(child.child_by_field_name('alias')), 'module': module, 'name': name})
+                else:
+                    imports.append({'alias': text(child), 'module': module, 'name': text(child)})
 
-        for child in node.children:
-            self._traverse(child, code, definitions, calls)
+    def _collect_require(self, node, src, imports):
+        text = lambda n: src[n.start_byte:n.end_byte].decode('utf8', 'replace')
+        args = node.child_by_field_name('arguments')
+        source = next((c for c in args.children if c.type == 'string'), None) if args else None
+        declarator = node.parent
+        if not source or not declarator or declarator.type != 'variable_declarator': return
+        module = text(source)[1:-1]
+        target = declarator.child_by_field_name('name')
+        if target.type == 'identifier':
+            imports.append({'alias': text(target), 'module': module, 'name': None})
+        elif target.type == 'object_pattern':
+            for child in target.children:
+                if child.type == 'shorthand_property_identifier_pattern':
+                    imports.append({'alias': text(child), 'module': module, 'name': text(child)})
+                elif child.type == 'pair_pattern':
+                    key, value = child.child_by_field_name('key'), child.child_by_field_name('value')
+                    if value.type == 'identifier':
+                        imports.append({'alias': text(value), 'module': module, 'name': text(key)})
@@ -0,0 +1,84 @@
+import re
+
+CHARS_PER_TOKEN = 4
+GAP_TOKENS = 8
+WORD = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+')
+
+def estimate_tokens(text):
+    return (len(text or '') + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def words(text):
+    return {w.lower() for w in WORD.findall(text or '') if len(w) > 2}
+
+# Keeps the signature and the shallowest statements (the function's outline) and
+# elides deeper blocks, marking each gap, until the code fits in `max_tokens`.
+def truncate_code(code, max_tokens):
+    code = code or ''
+    if estimate_tokens(code) <= max_tokens: return code
+    lines = code.split('\n')
+    depth = lambda line: len(line) - len(line.lstrip()) if line.strip() else None
+    order = sorted((i for i in range(1, len(lines)) if depth(lines[i]) is not None), key=lambda i: (depth(lines[i]), i))
+    keep, used = {0}, estimate_tokens(lines[0]) + GAP_TOKENS
+    for i in order:
+        # Each kept line may open a gap, so reserve room for its marker too.
+        cost = estimate_tokens(lines[i]) + GAP_TOKENS
+        if used + cost > max_tokens: break
+        keep.add(i)
+        used += cost
+    out, gap = [], []
+    for i, line in enumerate(lines):
+        if i not in keep:
+            gap.append(line)
+            continue
+        if gap: out.append(_gap_marker(gap))
+        out.append(line)
+        gap = []
+    if gap: out.append(_gap_marker(gap))
+    return '\n'.join(out)
+
+def _gap_marker(gap):
+    indent = next((len(l) - len(l.lstrip()) for l in gap if l.strip()), 0)
+    return f"{' ' * indent}... ({len(gap)} lines omitted)"
+
+class PromptBuilder:
+    def __init__(self, budget=6000, code_share=0.6):
+        self.budget = budget
+        self.code_share = code_share
+
+    # Dependencies that share words with the question come first, then the most
+    # connected ones; whatever does not fit the remaining budget is counted, not sent.
+    def rank(self, dependencies, question):
+        asked = words(question)
+        score = lambda d: (len(asked & words(f"{d.get('name')} {d.get('summary')}")), d.get('degree') or 0)
+        return sorted(dependencies, key=score, reverse=True)
+
+    def build(self, context, question):
+        target = context['target']
+        budget = self.budget - estimate_tokens(question)
+        code = truncate_code(target.get('code'), int(budget * self.code_share))
+        budget -= estimate_tokens(code)
+
+        deps, omitted = [], 0
+        for d in self.rank(context.get('dependencies', []), question):
+            line = f"- {d['name']}: {d.get('summary') or 'No summary.'}"
+            cost = estimate_tokens(line) + 1
+            if cost > budget:
+                omitted += 1
+                continue
+            deps.append(line)
+            budget -= cost
+        if omitted: deps.append(f"- ... {omitted} more dependencies omitted")
+
+        usages = []
+        for name in context.get('usages', []):
+            cost = estimate_tokens(name) + 2
+            if cost > budget: break
+            usages.append(name)
+            budget -= cost
+
+        deps = "\n".join(deps)
+        return f"""TARGET: {target.get('name')} ({target.get('file_path')})
+{code}
+DEPS: {deps}
+USED BY: {', '.join(usages)}
+QUESTION: {question}"""
@@ -0,0 +1,176 @@
+DIRECTIONS = ('callees', 'callers')
+
+# Plain breadth-first walk over the graph object, filtering every edge by type; used
+# when GraphService keeps no index. Returns (reachable count, [(node_id, distance)]).
+def bounded_bfs(graph, start, direction='callers', depth=None, edge_types=('calls',), limit=None):
+    if start not in graph: return 0, []
+    callers = direction == 'callers'
+    step = graph.predecessors if callers else graph.successors
+    seen, frontier, found, distance = {start}, [start], [], 0
+    while frontier and (depth is None or distance < depth):
+        distance += 1
+        level = []
+        for u in frontier:
+            for v in step(u):
+                if v in seen: continue
+                edge = graph.get_edge_data(v, u) if callers else graph.get_edge_data(u, v)
+                if edge.get('type') not in edge_types: continue
+                seen.add(v)
+                level.append(v)
+        found.extend((v, distance) for v in level)
+        frontier = level
+    return len(found), found[:limit]
+
+# Integer adjacency for one set of edge types plus its condensation: strongly connected
+# components collapsed into a DAG. Unbounded "who reaches X" questions walk the (much
+# smaller) component DAG and are memoized per component until the graph changes.
+class ReachabilityIndex:
+    def __init__(self, graph, edge_types=('calls',)):
+        self.edge_types = frozenset(edge_types)
+        if hasattr(graph, 'out_offsets'): self._from_arrays(graph)
+        else: self._from_edges(graph)
+
+        self.component = self._components(self.adj['callees'])
+        count = max(self.component, default=-1) + 1
+        self.sizes = [0] * count
+        for c in self.component: self.sizes[c] += 1
+        if count == len(self.ids):
+            # No cycles: every component is a single node and the DAG is the graph itself.
+            self.comp_adj = {direction: [None] * count for direction in DIRECTIONS}
+            for i, c in enumerate(self.component):
+                for direction in DIRECTIONS:
+                    self.comp_adj[direction][c] = tuple(self.component[j] for j in self.adj[direction][i])
+        else:
+            comp_out = [set() for _ in range(count)]
+            comp_in = [set() for _ in range(count)]
+            for i, targets in enumerate(self.adj['callees']):
+                c = self.component[i]
+                for j in targets:
+                    d = self.component[j]
+                    if c != d:
+                        comp_out[c].add(d)
+                        comp_in[d].add(c)
+            self.comp_adj = {'callees': [tuple(s) for s in comp_out], 'callers': [tuple(s) for s in comp_in]}
+        self._closure = {direction: {} for direction in DIRECTIONS}
+        self._pagerank = None
+
+    def _from_edges(self, graph):
+        self.ids = list(graph.nodes)
+        self.index = {node_id: i for i, node_id in enumerate(self.ids)}
+        out = [[] for _ in self.ids]
+        into = [[] for _ in self.ids]
+        for u, v, data in graph.edges(data=True):
+            if data.get('type') not in self.edge_types: continue
+            i, j = self.index[u], self.index[v]
+            out[i].append(j)
+            into[j].append(i)
+        self.adj = {'callees': [tuple(a) for a in out], 'callers': [tuple(a) for a in into]}
+
+    # CompactGraph and MappedGraph already hold integer CSR / CSC arrays: slice them and
+    # keep the graph's own ids and lookup, so a snapshot decodes no node id up front.
+    def _from_arrays(self, graph):
+        self.ids, self.index = graph.ids, graph.index
+        n = len(self.ids)
+        present = set(graph.out_types)
+        keep = {t for t in present if graph.strings[t] in self.edge_types}
+        node = list(range(n)).__getitem__  # one shared int object per node, not one per edge
+        self.adj = {}
+        for direction, offsets, ends, types in (('callees', graph.out_offsets, graph.out_targets, graph.out_types),
+                                                 ('callers', graph.in_offsets, graph.in_sources, graph.in_types)):
+            if keep == present:
+                self.adj[direction] = [tuple(map(node, ends[offsets[i]:offsets[i + 1]])) for i in range(n)]
+            else:
+                self.adj[direction] = [tuple(node(ends[k]) for k in range(offsets[i], offsets[i + 1]) if types[k] in keep)
+                                       for i in range(n)]
+
+    # Iterative Tarjan; recursion would overflow on long call chains.
+    def _components(self, adj):
+        n = len(adj)
+        index, low, component = [-1] * n, [0] * n, [-1] * n
+        stack, on_stack = [], [False] * n
+        counter = found = 0
+        for root in range(n):
+            if index[root] != -1: continue
+            work = [(root, 0)]
+            while work:
+                v, k = work.pop()
+                if k == 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                targets = adj[v]
+                while k < len(targets):
+                    w = targets[k]
+                    k += 1
+                    if index[w] == -1:
+                        work.append((v, k))
+                        work.append((w, 0))
+                        break
+                    if on_stack[w]: low[v] = min(low[v], index[w])
+                else:
+                    if low[v] == index[v]:
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = False
+                            component[w] = found
+                            if w == v: break
+                        found += 1
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[v])
+        return component
+
+    def __contains__(self, node_id):
+        return node_id in self.index
+
+    def neighbors(self, node_id, direction):
+        return [self.ids[j] for j in self.adj[direction][self.index[node_id]]]
+
+    def reach_count(self, node_id, direction):
+        c = self.component[self.index[node_id]]
+        memo = self._closure[direction]
+        if c not in memo:
+            adj = self.comp_adj[direction]
+            seen, frontier = {c}, [c]
+            while frontier:
+                frontier = set().union(*[adj[x] for x in frontier]) - seen
+                seen |= frontier
+            memo[c] = sum(self.sizes[x] for x in seen) - 1
+        return memo[c]
+
+    def traverse(self, node_id, direction='callers', depth=None, limit=None):
+        if node_id not in self.index: return 0, []
+        start = self.index[node_id]
+        adj = self.adj[direction]
+        seen, frontier, found, distance = {start}, [start], [], 0
+        while frontier and (depth is None or distance < depth):
+            # Without a depth bound the count comes from the condensation, so stop once enough nodes are listed.
+            if depth is None and limit is not None and len(found) >= limit: break
+            distance += 1
+            level = set().union(*[adj[u] for u in frontier]) - seen
+            seen |= level
+            frontier = sorted(level)
+            found.extend((self.ids[j], distance) for j in frontier)
+        count = self.reach_count(node_id, direction) if depth is None else len(found)
+        return count, found[:limit]
+
+    # Power iteration over the same adjacency; dangling nodes spread their rank evenly.
+    def pagerank(self, damping=0.85, iterations=20):
+        if self._pagerank is None:
+            n = len(self.ids) or 1
+            out = self.adj['callees']
+            rank = [1.0 / n] * n
+            for _ in range(iterations):
+                nxt = [0.0] * n
+                dangling = 0.0
+                for i, targets in enumerate(out):
+                    if not targets:
+                        dangling += rank[i]
+                        continue
+                    share = rank[i] / len(targets)
+                    for j in targets: nxt[j] += share
+                base = (1 - damping) / n + damping * dangling / n
+                rank = [base + damping * r for r in nxt]
+            self._pagerank = rank
+        return self._pagerank
@@ -0,0 +1,90 @@
+import contextlib
+import io
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .database import DB_PATH, DatabaseManager
+from .metrics import Metrics
+from .orchestrator import RepositoryOrchestrator
+from .snapshot import SNAPSHOT_SUFFIX, SnapshotStore
+
+REPO_PATH = "./data/repo"
+REPOS_DIR = "./data/repos"
+INDEX_DIR = "data/indexes"
+DEFAULT_REPO = "default"
+
+Repository = namedtuple("Repository", "name path db_path")
+
+# Every repository gets its own database, so scans of different repositories share no
+# locks and one can be rebuilt or deleted without touching the others.
+def repository(path, name=None):
+    name = name or os.path.basename(os.path.normpath(path))
+    return Repository(name, path, os.path.join(INDEX_DIR, f"{name}.db"))
+
+# The single-repository layout (data/repo, indexed into data/owlset.db) plus one
+# repository per directory in data/repos.
+def discover_repositories():
+    repos = []
+    if os.path.isdir(REPO_PATH) and os.listdir(REPO_PATH): repos.append(Repository(DEFAULT_REPO, REPO_PATH, DB_PATH))
+    if os.path.isdir(REPOS_DIR):
+        for name in sorted(os.listdir(REPOS_DIR)):
+            path = os.path.join(REPOS_DIR, name)
+            if os.path.isdir(path) and not name.startswith('.'): repos.append(repository(path))
+    return repos
+
+# The name picks the index file, so two repositories with one name would share (and wipe)
+# one database, and DEFAULT_REPO belongs to the single-repository layout in data/repo.
+def check_repositories(repos):
+    seen = {}
+    for repo in repos:
+        if not repo.name or repo.name.startswith('.') or '/' in repo.name or os.sep in repo.name:
+            raise ValueError(f"'{repo.name}' (for {repo.path}) is not usable as an index file name; pass --repo NAME=PATH.")
+        if repo.name == DEFAULT_REPO and repo.db_path != DB_PATH:
+            raise ValueError(f"The name '{DEFAULT_REPO}' is reserved for {REPO_PATH}; rename {repo.path} or pass --repo NAME=PATH.")
+        if repo.name in seen:
+            raise ValueError(f"{seen[repo.name]} and {repo.path} are both named '{repo.name}'; rename one or pass --repo NAME=PATH.")
+        seen[repo.name] = repo.path
+    return repos
+
+# Name -> index path of every repository with a database or a snapshot, for the
+# dashboard. A live database wins over a snapshot of the same name.
+def indexed_repositories():
+    found = {}
+    if os.path.exists(DB_PATH): found[DEFAULT_REPO] = DB_PATH
+    if os.path.isdir(INDEX_DIR):
+        files = sorted(os.listdir(INDEX_DIR), key=lambda f: (f.endswith(SNAPSHOT_SUFFIX), f))
+        for file in files:
+            name, ext = os.path.splitext(file)
+            if ext in ('.db', SNAPSHOT_SUFFIX): found.setdefault(name, os.path.join(INDEX_DIR, file))
+    return found
+
+def open_index(path, metrics=None):
+    if path.endswith(SNAPSHOT_SUFFIX): return SnapshotStore(path, metrics)
+    return DatabaseManager(path, metrics=metrics)
+
+def scan_repository(repo, full=False, workers=1, quiet=False):
+    metrics = Metrics()
+    orchestrator = RepositoryOrchestrator(repo.path, db=DatabaseManager(repo.db_path, metrics=metrics))
+    with metrics.timer("run"):
+        if not quiet: orchestrator.scan(full=full, workers=workers)
+        else:
+            with contextlib.redirect_stdout(io.StringIO()): orchestrator.scan(full=full, workers=workers)
+    orchestrator.db.close()
+    return metrics.report()
+
+# Scans `repos` with up to `parallel` at a time, each in its own process (and each with
+# `workers` parser processes). Returns name -> metrics report.
+def scan_repositories(repos, full=False, workers=1, parallel=1):
+    if parallel <= 1 or len(repos) < 2:
+        return {repo.name: scan_repository(repo, full, workers) for repo in repos}
+    reports = {}
+    with ProcessPoolExecutor(min(parallel, len(repos))) as pool:
+        futures = {pool.submit(scan_repository, repo, full, workers, True): repo for repo in repos}
+        for future in as_completed(futures):
+            repo = futures[future]
+            report = reports[repo.name] = future.result()
+            counters = report["counters"]
+            parsed = counters.get('files.parsed', 0)
+            print(f"   [{repo.name}] {parsed} parsed, {counters.get('files.discovered', 0) - parsed} unchanged, "
+                  f"{counters.get('calls.resolved', 0)} calls linked in {report['stages']['run']['seconds']:.1f}s")
+    return reports
@@ -1,13 +1,117 @@
+import posixpath
+from functools import lru_cache
+
+JS_SUFFIXES = ('', '.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs', '/index.js', '/index.jsx', '/index.ts', '/index.tsx')
+SELF_RECEIVERS = ('self', 'this', 'cls')
+CONSTRUCTORS = ('__init__', 'constructor')
+CACHE_SIZE = 16384
+
 class Linker:
     def __init__(self, db_manager):
         self.db = db_manager
+        self.stats = {"resolved": 0, "ambiguous": 0, "unresolved": 0}
+
+    # Only the file list is held in full; functions and imports are looked up in the
+    # database on demand behind bounded caches, so linking memory does not grow with the repo.
+    def prepare(self):
+        self.files = set(self.db.get_indexed_files())
+        self.py_modules = {}
+        for path in self.files:
+            if not path.endswith('.py'): continue
+            parts = path[:-3].replace('\\', '/').split('/')
+            if parts[-1] == '__init__': parts.pop()
+            for i in range(len(parts)):
+                self.py_modules.setdefault('.'.join(parts[i:]), []).append(path)
+        self.functions_in = lru_cache(CACHE_SIZE // 64)(lambda path: frozenset(self.db.get_file_nodes(path)))
+        self.functions_named = lru_cache(CACHE_SIZE)(lambda name: [r['id'] for r in self.db.get_functions_by_name(name)])
+        self.imports_for = lru_cache(CACHE_SIZE // 16)(self._load_imports)
+        self._module_at = lru_cache(CACHE_SIZE)(self._resolve_module)
+        self.stats = {"resolved": 0, "ambiguous": 0, "unresolved": 0}
+
+    def _load_imports(self, file_path):
+        aliases, stars = {}, []
+        for row in self.db.get_imports(file_path):
+            if row['alias'] == '*': stars.append(row['module'])
+            else: aliases[row['alias']] = (row['module'], row['name'])
+        return aliases, stars
+
+    def resolve_module(self, from_file, module):
+        return self._module_at(posixpath.dirname(from_file), module, from_file.endswith('.py'))
+
+    def _resolve_module(self, base, module, python):
+        if not python:
+            if not module.startswith('.'): return None
+            path = posixpath.normpath(posixpath.join(base, module))
+            return next((path + s for s in JS_SUFFIXES if path + s in self.files), None)
+        if module.startswith('.'):
+            dots = len(module) - len(module.lstrip('.'))
+            for _ in range(dots - 1): base = posixpath.dirname(base)
+            path = posixpath.join(base, *module[dots:].split('.')) if module[dots:] else base
+            return next((p for p in (path + '.py', posixpath.join(path, '__init__.py')) if p in self.files), None)
+        candidates = self.py_modules.get(module, [])
+        exact = [c for c in candidates if c[:-3].replace('/', '.') in (module, module + '.__init__')]
+        if exact: return exact[0]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def _lookup(self, file_path, qualname):
+        if not file_path: return None
+        for candidate in (qualname,) + tuple(f"{qualname}.{c}" for c in CONSTRUCTORS):
+            node_id = f"{file_path}::{candidate}"
+            if node_id in self.functions_in(file_path): return node_id
+        return None
+
+    def _via_import(self, file_path, module, imported, name):
+        if imported is None: return self._lookup(self.resolve_module(file_path, module), name)
+        if file_path.endswith('.py'):
+            submodule = self.resolve_module(file_path, f"{module}.{imported}" if module.strip('.') else module + imported)
+            if submodule: return self._lookup(submodule, name)
+        target = self.resolve_module(file_path, module)
+        if imported == 'default': return self._lookup(target, name)
+        return self._lookup(target, f"{imported}.{name}")
+
+    def _unique(self, name):
+        candidates = self.functions_named(name)
+        if len(candidates) == 1: return self._hit(candidates[0])
+        self.stats["ambiguous" if candidates else "unresolved"] += 1
+        return None
+
+    def _hit(self, node_id):
+        self.stats["resolved" if node_id else "unresolved"] += 1
+        return node_id
+
+    def resolve(self, call):
+        file_path, name, receiver = call['file_path'], call['name'], call['receiver']
+        aliases, stars = self.imports_for(file_path)
+        qualname = call['caller_id'].split('::', 1)[1]
+        caller_class = qualname.rsplit('.', 1)[0] if '.' in qualname else None
+
+        if receiver is None:
+            local = self._lookup(file_path, name)
+            if local: return self._hit(local)
+            if name in aliases:
+                module, imported = aliases[name]
+                if imported is None: return self._hit(None)
+                if imported == 'default': imported = name
+                target = self._lookup(self.resolve_module(file_path, module), imported)
+                return self._hit(target)
+            for module in stars:
+                target = self._lookup(self.resolve_module(file_path, module), name)
+                if target: return self._hit(target)
+            return self._hit(None)
 
-    def match_call(self, caller_file, called_func_name, global_map):
-        candidates = global_map.get(called_func_name, [])
-        if not candidates: return None
-        
-        local_id = f"{caller_file}::{called_func_name}"
-        if local_id in candidates: return local_id
-        if len(candidates) == 1: return candidates[0]
-        return candidates[0]
+        if receiver in SELF_RECEIVERS:
+            if caller_class:
+                target = self._lookup(file_path, f"{caller_class}.{name}")
+                if target: return self._hit(target)
+            methods = [i for i in self.functions_named(name) if '.' in i.split('::', 1)[1]]
+            if len(methods) == 1: return self._hit(methods[0])
+            self.stats["ambiguous" if methods else "unresolved"] += 1
+            return None
 
+        if receiver in aliases:
+            module, imported = aliases[receiver]
+            return self._hit(self._via_import(file_path, module, imported, name))
+        local_class = self._lookup(file_path, f"{receiver}.{name}")
+        if local_class: return self._hit(local_class)
+        if receiver.split('.')[0] in aliases: return self._hit(None)
+        return self._unique(name)
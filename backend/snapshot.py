@@ -0,0 +1,259 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from contextlib import nullcontext
+from functools import lru_cache
+from .compact_graph import INT_COLUMNS, STRING_COLUMNS, CompactGraph, _NodeView
+from .metrics import Metrics
+
+MAGIC = b"OWLSNAP\0"
+FORMAT = 1
+SNAPSHOT_SUFFIX = ".owlsnap"
+ALIGN = 8
+CSR_ARRAYS = ('out_offsets', 'out_targets', 'out_types', 'in_offsets', 'in_sources', 'in_types')
+STRING_CACHE = 65536
+BLOB_CACHE = 64
+
+# File layout: MAGIC, u64 header length, JSON header, then 8-byte aligned sections
+# holding native arrays. The header maps each section to (offset, bytes, typecode).
+# Code is grouped per source file, zlib-compressed, and written last, so opening a
+# snapshot touches none of its pages until some code is actually read.
+def export_snapshot(db, path, level=6):
+    graph = CompactGraph(db.get_nodes_since(-1), db.get_edges())
+    strings = graph.strings
+    n = len(graph.ids)
+    ids = array('i', (strings.intern(node_id) for node_id in graph.ids))
+    order = array('i', sorted(range(n), key=graph.ids.__getitem__))
+
+    blob = array('i', [-1]) * n
+    start, length = array('i', [0]) * n, array('i', [0]) * n
+    blobs, current, parts, size = [], None, [], 0
+    def flush():
+        if parts: blobs.append(zlib.compress(b"".join(parts), level))
+    for row in db.iter_node_code():
+        i = graph.index.get(row['id'])
+        if i is None: continue
+        if row['file_path'] != current:
+            flush()
+            current, parts, size = row['file_path'], [], 0
+        code = row['code'].encode('utf-8')
+        blob[i], start[i], length[i] = len(blobs), size, len(code)
+        parts.append(code)
+        size += len(code)
+    flush()
+
+    data = [s.encode('utf-8') for s in strings.strings[1:]]
+    string_offsets = array('q', [0, 0])
+    for s in data: string_offsets.append(string_offsets[-1] + len(s))
+    blob_offsets = array('q', [0])
+    for b in blobs: blob_offsets.append(blob_offsets[-1] + len(b))
+
+    sections = [('string_offsets', string_offsets), ('string_data', b"".join(data)), ('ids', ids), ('id_order', order),
+                ('has_row', graph.has_row)]
+    sections += [(f"column.{c}", graph.columns[c]) for c in STRING_COLUMNS + INT_COLUMNS]
+    sections += [(name, getattr(graph, name)) for name in CSR_ARRAYS]
+    sections += [('code_blob', blob), ('code_start', start), ('code_length', length),
+                 ('blob_offsets', blob_offsets), ('blob_data', b"".join(blobs))]
+
+    generation, _ = db.get_generation()
+    header = {"format": FORMAT, "byteorder": sys.byteorder, "generation": generation, "nodes": n,
+              "edges": graph.number_of_edges(), "code_codec": "zlib", "sections": {}}
+    offset = 0
+    for name, values in sections:
+        typecode = values.typecode if isinstance(values, array) else 'B'
+        nbytes = len(values) * values.itemsize if isinstance(values, array) else len(values)
+        header["sections"][name] = [offset, nbytes, typecode]
+        offset += -(-nbytes // ALIGN) * ALIGN
+    encoded = json.dumps(header).encode('utf-8')
+    encoded += b" " * (-(len(MAGIC) + 8 + len(encoded)) % ALIGN)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(encoded)) + encoded)
+        for name, values in sections:
+            raw = values.tobytes() if isinstance(values, array) else values
+            f.write(raw + b"\0" * (-len(raw) % ALIGN))
+    os.replace(path + ".tmp", path)
+    return header
+
+# Loads a snapshot back into a database (replacing its contents) so the full toolchain,
+# including incremental scans, can continue from it. The file manifest is not part of
+# a snapshot, so the next scan re-parses every file once.
+def import_snapshot(path, db, batch_size=5000):
+    graph = MappedGraph(path)
+    with db.session():
+        db.reset()
+        batch, summaries = [], []
+        for i, node_id in enumerate(graph.ids):
+            attrs = graph.node_attrs(i)
+            if not attrs: continue
+            batch.append({**attrs, "code": graph.code(i)})
+            if attrs['summary']: summaries.append((node_id, attrs['summary']))
+            if len(batch) >= batch_size:
+                db.upsert_nodes(batch)
+                batch = []
+        db.upsert_nodes(batch)
+        db.update_summaries(summaries)
+        db.add_edges((u, v, attrs['type']) for u, v, attrs in graph.edges(data=True))
+    return graph.header
+
+class _Strings:
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+        self.get = lru_cache(STRING_CACHE)(self._decode)
+
+    def _decode(self, i):
+        if not i: return None
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+    def __getitem__(self, i):
+        return self.get(i)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+class _Ids:
+    def __init__(self, column, strings):
+        self.column = column
+        self.strings = strings
+
+    def __getitem__(self, i):
+        return self.strings[self.column[i]]
+
+    def __len__(self):
+        return len(self.column)
+
+    def __iter__(self):
+        return (self.strings[k] for k in self.column)
+
+# node id -> index by binary search over the ids in sorted order, so opening a snapshot
+# never builds a dict over every node.
+class _SortedIndex:
+    def __init__(self, order, ids):
+        self.order = order
+        self.ids = ids
+
+    def get(self, node_id, default=None):
+        k = bisect_left(self.order, node_id, key=self.ids.__getitem__)
+        if k < len(self.order) and self.ids[self.order[k]] == node_id: return self.order[k]
+        return default
+
+    def __getitem__(self, node_id):
+        i = self.get(node_id)
+        if i is None: raise KeyError(node_id)
+        return i
+
+    def __contains__(self, node_id):
+        return self.get(node_id) is not None
+
+# CompactGraph over a memory-mapped snapshot: the arrays are views into the file, and
+# strings and code are decoded only when asked for.
+class MappedGraph(CompactGraph):
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC: raise ValueError(f"Not an Owlset snapshot: {path}")
+        length, = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        base = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[base:base + length])
+        if self.header["format"] != FORMAT: raise ValueError(f"Unsupported snapshot format {self.header['format']}: {path}")
+        self._base = base + length
+        self._swap = self.header["byteorder"] != sys.byteorder
+
+        self.strings = _Strings(self._section('string_offsets'), self._section('string_data'))
+        self.ids = _Ids(self._section('ids'), self.strings)
+        self.index = _SortedIndex(self._section('id_order'), self.ids)
+        self.has_row = self._section('has_row')
+        self.columns = {c: self._section(f"column.{c}") for c in STRING_COLUMNS + INT_COLUMNS}
+        for name in CSR_ARRAYS: setattr(self, name, self._section(name))
+        self.nodes = _NodeView(self)
+        self._code = [self._section(name) for name in ('code_blob', 'code_start', 'code_length')]
+        self._blob_offsets, self._blob_data = self._section('blob_offsets'), self._section('blob_data')
+        self._blob = lru_cache(BLOB_CACHE)(self._inflate)
+
+    def _section(self, name):
+        offset, nbytes, typecode = self.header["sections"][name]
+        view = memoryview(self._mmap)[self._base + offset:self._base + offset + nbytes]
+        if typecode == 'B' or not self._swap: return view.cast(typecode)
+        # Written on a machine of the other byte order: copy and swap instead of mapping.
+        values = array(typecode, view.tobytes())
+        values.byteswap()
+        return values
+
+    def _inflate(self, b):
+        return zlib.decompress(self._blob_data[self._blob_offsets[b]:self._blob_offsets[b + 1]])
+
+    def code(self, i):
+        blob, start, length = (column[i] for column in self._code)
+        if blob < 0: return None
+        return self._blob(blob)[start:start + length].decode('utf-8')
+
+# Read-only stand-in for DatabaseManager backed by a snapshot, for GraphService and the
+# dashboard. The 'mapped' GraphService backend serves the mapped graph itself; the other
+# backends load rows from it like from a database.
+class SnapshotStore:
+    def __init__(self, path, metrics=None):
+        self.db_path = path
+        self.metrics = metrics or Metrics()
+        self.graph = MappedGraph(path)
+
+    def close(self):
+        pass
+
+    def mapped_graph(self):
+        return self.graph
+
+    def get_generation(self):
+        return self.graph.header["generation"], 0
+
+    def snapshot(self):
+        return nullcontext(self)
+
+    def get_nodes_since(self, version):
+        return [attrs for _, attrs in self.graph.nodes(data=True) if attrs and attrs['version'] > version]
+
+    def get_edges(self):
+        return [{"source_id": u, "target_id": v, "type": attrs['type']} for u, v, attrs in self.graph.edges(data=True)]
+
+    def get_edges_since(self, version):
+        return self.get_edges() if version < self.graph.header["generation"] else []
+
+    def get_tombstones_since(self, version):
+        return []
+
+    def get_node_code(self, node_id):
+        i = self.graph.index.get(node_id)
+        return None if i is None else self.graph.code(i)
+
+    # No full-text index in a snapshot: a scan over function names and paths, ranked
+    # like DatabaseManager.search_functions.
+    def search_functions(self, query, limit=50):
+        q = (query or '').strip().lower()
+        g = self.graph
+        names, paths, types = (g.columns[c] for c in ('name', 'file_path', 'type'))
+        found = []
+        for i in range(len(g.ids)):
+            if not g.has_row[i] or g.strings[types[i]] != 'function': continue
+            name, path = g.strings[names[i]] or '', g.strings[paths[i]] or ''
+            lower = name.lower()
+            if not q: tier = 0
+            elif lower == q: tier = 0
+            elif lower.startswith(q): tier = 1
+            elif q in lower: tier = 2
+            elif q in path.lower(): tier = 3
+            else: continue
+            found.append((tier, len(name) if q else name, g.ids[i], name, path))
+        found.sort()
+        return [{"id": node_id, "name": name, "file_path": path} for _, _, node_id, name, path in found[:limit]]
+
+    def get_cached_response(self, prompt_hash):
+        return None
+
+    def cache_response(self, prompt_hash, response):
+        pass
@@ -0,0 +1,32 @@
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+class StubError(Exception):
+    pass
+
+# Offline stand-in for the Mistral client, used for tests and benchmarks.
+class StubMistral:
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(complete=self._complete, stream=self._stream)
+
+    def _complete(self, model, messages):
+        with self._lock:
+            self.calls += 1
+            fail = self._rng.random() < self.failure_rate
+        if self.latency: time.sleep(self.latency)
+        if fail: raise StubError("stubbed transient failure")
+        prompt = messages[-1]['content']
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"[stub:{model}] {prompt[:60]}"))])
+
+    def _stream(self, model, messages):
+        text = self._complete(model, messages).choices[0].message.content
+        for i in range(0, len(text), 8):
+            delta = SimpleNamespace(content=text[i:i + 8])
+            yield SimpleNamespace(data=SimpleNamespace(choices=[SimpleNamespace(delta=delta)]))
@@ -0,0 +1,102 @@
+import hashlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+def code_hash(code):
+    return hashlib.sha1((code or '').encode('utf-8')).hexdigest()
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate: return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class SummaryEngine:
+    def __init__(self, ai, db, concurrency=8, rate=5.0, retries=3, backoff=1.0, batch_size=25):
+        self.ai = ai
+        self.db = db
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate)
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.stats = {"requested": 0, "cached": 0, "summarized": 0, "failed": 0, "retries": 0}
+        self._stats_lock = threading.Lock()
+
+    def _summarize(self, code, name):
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            start = time.perf_counter()
+            try:
+                return self.ai.summarize_function(code, name, raise_errors=True)
+            except Exception:
+                if attempt == self.retries: raise
+                with self._stats_lock: self.stats["retries"] += 1
+            finally:
+                # Taken before any backoff below, so the sample is the call alone.
+                self.db.metrics.observe("ai.latency", time.perf_counter() - start)
+            time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+
+    def run(self, nodes):
+        with self.db.metrics.timer("summarize"): self._run(nodes)
+        for key in ("cached", "summarized", "failed", "retries"): self.db.metrics.count(f"summaries.{key}", self.stats[key])
+        return dict(self.stats)
+
+    def _run(self, nodes):
+        by_hash = {}
+        for n in nodes:
+            by_hash.setdefault(code_hash(n['code']), []).append(n)
+        # Per run: SummaryQueue reuses one engine, and run() adds these to the metrics.
+        self.stats = dict.fromkeys(self.stats, 0)
+        self.stats["requested"] = len(nodes)
+
+        cached = self.db.get_cached_summaries(by_hash)
+        done = [(n['id'], cached[h]) for h in cached for n in by_hash.pop(h)]
+        self.stats["cached"] = len(done)
+        print(f"   {len(done)} served from cache, {len(by_hash)} unique bodies to summarize.")
+        self._flush(done, [])
+
+        summaries, new_cache = [], []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(self._summarize, group[0]['code'], group[0]['name']): h for h, group in by_hash.items()}
+            for i, future in enumerate(as_completed(futures)):
+                h = futures[future]
+                group = by_hash[h]
+                try:
+                    s = future.result()
+                except Exception as e:
+                    s = None
+                    print(f"   [{i+1}/{len(futures)}] {group[0]['name']} failed: {e}")
+                if not s:
+                    self.stats["failed"] += len(group)
+                    continue
+                print(f"   [{i+1}/{len(futures)}] {group[0]['name']}...")
+                self.stats["summarized"] += len(group)
+                new_cache.append((h, s))
+                summaries.extend((n['id'], s) for n in group)
+                if len(summaries) >= self.batch_size:
+                    self._flush(summaries, new_cache)
+                    summaries, new_cache = [], []
+        self._flush(summaries, new_cache)
+
+    def _flush(self, summaries, new_cache):
+        with self.db.session():
+            self.db.update_summaries(summaries)
+            self.db.cache_summaries(new_cache)
@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+import time
+from .database import DatabaseManager
+from .orchestrator import discover, is_source
+from .summarizer import SummaryEngine
+try:
+    from watchdog.observers import Observer
+except ImportError:  # optional; without it the tree is polled
+    Observer = None
+
+# A poll may take at most this share of wall time: on a large tree the interval
+# stretches to WALK_RATIO times the last walk instead of walking back to back.
+WALK_RATIO = 5
+
+# Polls the tree (same discovery rules as a scan) and yields sets of changed
+# repository-relative paths once no further change has been seen for `debounce` seconds,
+# so an editor's save-rename-touch sequence arrives as one batch.
+class PollingWatcher:
+    def __init__(self, repo_path, interval=0.1, debounce=0.2):
+        self.repo_path = repo_path
+        self.interval = interval
+        self.debounce = debounce
+        self.walk_seconds = 0.0
+        self.state = self.snapshot()
+
+    def snapshot(self):
+        start = time.perf_counter()
+        state = {}
+        for full_path in discover(self.repo_path):
+            try: stat = os.stat(full_path)
+            except FileNotFoundError: continue
+            state[os.path.relpath(full_path, self.repo_path)] = (stat.st_size, stat.st_mtime_ns)
+        self.walk_seconds = time.perf_counter() - start
+        return state
+
+    def poll(self):
+        current = self.snapshot()
+        changed = {p for p in current.keys() | self.state.keys() if current.get(p) != self.state.get(p)}
+        self.state = current
+        return changed
+
+    def batches(self, stop=None):
+        pending, last_change = set(), 0.0
+        try:
+            while not (stop and stop.is_set()):
+                changed = self.poll()
+                now = time.monotonic()
+                if changed:
+                    pending |= changed
+                    last_change = now
+                elif pending and now - last_change >= self.debounce:
+                    yield pending
+                    pending = set()
+                time.sleep(max(self.interval, WALK_RATIO * self.walk_seconds))
+        finally:
+            self.close()
+
+    def close(self):
+        pass
+
+# Filesystem events from watchdog (inotify, FSEvents, ReadDirectoryChangesW): a poll
+# stats only the paths events named. Directory creates, moves and deletes can hide the
+# files inside them, so those fall back to one full walk.
+class EventWatcher(PollingWatcher):
+    def __init__(self, repo_path, interval=0.1, debounce=0.2):
+        self.events = queue.SimpleQueue()
+        self.observer = Observer()
+        self.observer.schedule(self, repo_path, recursive=True)
+        self.observer.start()
+        super().__init__(repo_path, interval, debounce)
+        self.walk_seconds = 0.0
+
+    # Called by the observer thread for every event.
+    def dispatch(self, event):
+        if event.event_type in ('opened', 'closed_no_write'): return
+        if event.is_directory:
+            if event.event_type != 'modified': self.events.put(None)
+            return
+        self.events.put([p for p in (event.src_path, getattr(event, 'dest_path', None)) if p])
+
+    def poll(self):
+        paths, walk = set(), False
+        while True:
+            try: event = self.events.get_nowait()
+            except queue.Empty: break
+            if event is None: walk = True
+            else: paths.update(event)
+        if walk:
+            changed = super().poll()
+            self.walk_seconds = 0.0
+            return changed
+        changed = set()
+        for full_path in paths:
+            rel_path = os.path.relpath(os.fsdecode(full_path), self.repo_path)
+            if not is_source(rel_path): continue
+            try:
+                stat = os.stat(full_path)
+                current = (stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError: current = None
+            if current == self.state.get(rel_path): continue
+            changed.add(rel_path)
+            if current: self.state[rel_path] = current
+            else: self.state.pop(rel_path, None)
+        return changed
+
+    def close(self):
+        self.observer.stop()
+        self.observer.join()
+
+# Summarizes functions in the background on its own connection, so a slow model
+# never holds up the index update that the dashboard is waiting for.
+class SummaryQueue(threading.Thread):
+    def __init__(self, ai, db_path, **engine_options):
+        super().__init__(daemon=True)
+        self.ai = ai
+        self.db_path = db_path
+        self.engine_options = engine_options
+        self.queue = queue.Queue()
+
+    def submit(self, node_ids):
+        if node_ids: self.queue.put(list(node_ids))
+
+    def run(self):
+        db = DatabaseManager(self.db_path)
+        engine = SummaryEngine(self.ai, db, **self.engine_options)
+        while True:
+            node_ids = set(self.queue.get())
+            while not self.queue.empty(): node_ids.update(self.queue.get_nowait())
+            # One bad batch (a dropped connection, a locked database) must not end the
+            # thread; its functions stay unsummarized and are picked up on the next run.
+            try:
+                stats = engine.run(list(db.get_function_sources(node_ids)))
+            except Exception as e:
+                print(f"   WARNING: Summarizing {len(node_ids)} function(s) failed: {e}")
+                continue
+            print(f"   {stats['summarized']} summarized, {stats['cached']} cached, {stats['failed']} failed.")
+
+def watch(orchestrator, summaries=None, interval=0.1, debounce=0.2, stop=None):
+    watcher = (EventWatcher if Observer else PollingWatcher)(orchestrator.repo_path, interval, debounce)
+    how = "filesystem events" if Observer else f"polling every {max(interval, WALK_RATIO * watcher.walk_seconds):.1f}s"
+    print(f"Watching {orchestrator.repo_path} for changes via {how} (Ctrl+C to stop).")
+    for paths in watcher.batches(stop):
+        start = time.perf_counter()
+        # The batch rolls back on error; keep watching so the next save is picked up.
+        try:
+            changed = orchestrator.update(paths)
+        except Exception as e:
+            print(f"   WARNING: Re-indexing {', '.join(sorted(paths))} failed: {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        orchestrator.db.metrics.add_time("watch.update", elapsed)
+        if not changed: continue
+        orchestrator.db.metrics.observe("watch.latency", elapsed)
+        print(f"   Re-indexed {len(changed)} file(s) in {elapsed * 1000:.0f} ms: {', '.join(sorted(changed))}")
+        if summaries: summaries.submit(orchestrator.db.get_unsummarized_function_ids(changed))
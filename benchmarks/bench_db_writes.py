@@ -0,0 +1,50 @@
+import argparse
+import os
+import tempfile
+import time
+from backend.database import DatabaseManager
+
+def make_rows(n):
+    nodes = [{
+        "id": f"pkg/mod_{i // 50}.py::func_{i}", "name": f"func_{i}", "type": "function",
+        "file_path": f"pkg/mod_{i // 50}.py", "start_line": 1, "end_line": 10,
+        "code": f"def func_{i}():\n    return {i}\n"
+    } for i in range(n)]
+    edges = [(nodes[i]['id'], nodes[(i * 7 + 1) % n]['id'], "calls") for i in range(n)]
+    return nodes, edges
+
+def per_row(db, nodes, edges):
+    # Reproduces the original write path: default journal and one commit per row.
+    db.conn.execute("PRAGMA journal_mode=DELETE")
+    db.conn.execute("PRAGMA synchronous=FULL")
+    for n in nodes: db.upsert_node(n)
+    for e in edges: db.add_edge(*e)
+
+def batched(db, nodes, edges, batch_size=1000):
+    for i in range(0, len(nodes), batch_size):
+        with db.session():
+            db.upsert_nodes(nodes[i:i + batch_size])
+            db.add_edges(edges[i:i + batch_size])
+
+def run(label, fn, nodes, edges):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        start = time.perf_counter()
+        fn(db, nodes, edges)
+        elapsed = time.perf_counter() - start
+        db.conn.close()
+    rows = len(nodes) + len(edges)
+    print(f"{label:<10} {rows:>8} rows  {elapsed:8.2f}s  {rows / elapsed:12.0f} rows/s")
+    return rows / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-row commits with batched sessions.")
+    parser.add_argument("--rows", type=int, default=5000, help="number of nodes (and edges) to write")
+    args = parser.parse_args()
+    nodes, edges = make_rows(args.rows)
+    before = run("per-row", per_row, nodes, edges)
+    after = run("batched", batched, nodes, edges)
+    print(f"speedup    {after / before:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from backend.database import DatabaseManager
+from backend.graph_service import GraphService
+from benchmarks.synthetic import populate_db
+
+def measure(db, backend, sample):
+    tracemalloc.start()
+    probe = GraphService(db=db, backend=backend)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del probe
+    start = time.perf_counter()
+    service = GraphService(db=db, backend=backend)
+    load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    contexts = [service.get_context_for_function(node_id) for node_id in sample]
+    query = (time.perf_counter() - start) / len(sample)
+    start = time.perf_counter()
+    full = service.get_full_graph_data()
+    full_time = time.perf_counter() - start
+    print(f"{backend:<9} load {load:6.2f}s  memory {memory / 2**20:8.1f} MiB  "
+          f"context {query * 1e6:8.1f} us/query  full graph {full_time:6.2f}s")
+    return contexts, full
+
+def normalize(contexts, full):
+    ctx = [(c['target']['id'], sorted(d['name'] for d in c['dependencies']), sorted(c['usages'])) for c in contexts]
+    nodes, edges = full
+    return ctx, sorted(n['id'] + n['color'] for n in nodes), sorted(e['source'] + e['target'] for e in edges)
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and query latency of the networkx and compact graph backends.")
+    parser.add_argument("--functions", type=int, default=50000)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        ids = populate_db(db, args.functions, fanout=args.fanout)
+        sample = random.Random(1).sample(ids, min(args.queries, len(ids)))
+        results = [normalize(*measure(db, backend, sample)) for backend in ("networkx", "compact")]
+        print("results match" if results[0] == results[1] else "RESULTS DIFFER")
+        db.conn.close()
+
+if __name__ == "__main__":
+    main()
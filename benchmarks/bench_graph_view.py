@@ -0,0 +1,40 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from backend.database import DatabaseManager
+from backend.graph_service import GraphService
+from benchmarks.synthetic import populate_db
+
+def report(label, fn):
+    start = time.perf_counter()
+    nodes, edges = fn()
+    elapsed = time.perf_counter() - start
+    size = len(json.dumps({"nodes": nodes, "edges": edges}))
+    print(f"{label:<34} {elapsed:7.2f}s  {len(nodes):>7} nodes  {len(edges):>7} edges  {size / 2**20:7.2f} MiB")
+
+def page(view):
+    return view['nodes'], view['edges']
+
+def main():
+    parser = argparse.ArgumentParser(description="Size and build time of full-graph exports at each level of detail.")
+    parser.add_argument("--functions", type=int, default=100000)
+    parser.add_argument("--fanout", type=int, default=4)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        populate_db(db, args.functions, fanout=args.fanout)
+        service = GraphService(db=db)
+        with service.lock.read(): service._index()
+        report("every function (get_full_graph_data)", service.get_full_graph_data)
+        report("by directory", lambda: page(service.get_graph_view('directory')))
+        report("by file, top 200 by degree", lambda: page(service.get_graph_view('file', top_k=200)))
+        report("by file, top 200 by pagerank", lambda: page(service.get_graph_view('file', top_k=200, rank='pagerank')))
+        report("drill into pkg_0, top 200", lambda: page(service.get_graph_view('directory', 'pkg_0', top_k=200)))
+        report("functions, first page of 2000", lambda: page(service.get_graph_view('function', page_size=2000)))
+        report("  same page again (cached)", lambda: page(service.get_graph_view('function', page_size=2000)))
+        db.conn.close()
+
+if __name__ == "__main__":
+    main()
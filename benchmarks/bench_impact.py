@@ -0,0 +1,42 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from backend.database import DatabaseManager
+from backend.graph_service import GraphService
+from benchmarks.synthetic import populate_db
+
+def timed(service, sample, depth):
+    start = time.perf_counter()
+    results = [service.get_impact(node_id, depth=depth) for node_id in sample]
+    return (time.perf_counter() - start) / len(sample) * 1000, [(r['count'], [n['id'] for n in r['nodes']]) for r in results]
+
+def main():
+    parser = argparse.ArgumentParser(description="Transitive caller queries with and without the reachability index.")
+    parser.add_argument("--functions", type=int, default=100000)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+    for shape in ("cyclic", "acyclic"):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(os.path.join(tmp, "bench.db"))
+            ids = populate_db(db, args.functions, fanout=args.fanout, acyclic=shape == "acyclic")
+            sample = random.Random(1).sample(ids, min(args.queries, len(ids)))
+            plain = GraphService(db=db, reachability=False)
+            indexed = GraphService(db=db)
+            start = time.perf_counter()
+            with indexed.lock.read(): index = indexed._index()
+            build = time.perf_counter() - start
+            print(f"{shape}: {args.functions} functions, {len(index.sizes)} components, index built in {build:.2f}s")
+            for depth in (3, None):
+                base_ms, expected = timed(plain, sample, depth)
+                cold_ms, got = timed(indexed, sample, depth)
+                warm_ms, _ = timed(indexed, sample, depth)
+                same = [c for c, _ in got] == [c for c, _ in expected]
+                print(f"  depth {str(depth):<5} bfs {base_ms:8.2f} ms  index {cold_ms:8.2f} ms  memoized {warm_ms:8.2f} ms  "
+                      f"avg reach {sum(c for c, _ in got) / len(got):9.0f}  {'counts match' if same else 'COUNTS DIFFER'}")
+            db.conn.close()
+
+if __name__ == "__main__":
+    main()
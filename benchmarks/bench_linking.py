@@ -0,0 +1,43 @@
+import argparse
+import os
+import tempfile
+import time
+from backend.parser_engine import CodeParser
+from benchmarks.synthetic import python_source
+
+def attribute_by_range(definitions, calls):
+    # The original linker: every definition checked against every call by line range.
+    pairs = []
+    for func in definitions:
+        for call in calls:
+            if func['start'] <= call['line'] <= func['end']:
+                pairs.append((func['name'], call['name']))
+    return pairs
+
+def attribute_by_scope(definitions, calls):
+    return [(call['caller'], call['name']) for call in calls if call['caller']]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare range-scan and scope-based caller attribution.")
+    parser.add_argument("--lines", type=int, default=50000, help="approximate size of the generated file")
+    args = parser.parse_args()
+
+    # Each top-level function spans 15 lines with nesting=2 and 3 calls per level.
+    source = python_source(max(1, args.lines // 15), calls_per_function=3, nesting=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "generated.py")
+        with open(path, "w") as f:
+            f.write(source)
+        start = time.perf_counter()
+        data = CodeParser().parse_file(path, tmp)
+        parse_time = time.perf_counter() - start
+
+    defs, calls = data['definitions'], data['calls']
+    print(f"file: {source.count(chr(10))} lines, {len(defs)} definitions, {len(calls)} calls (parse {parse_time:.2f}s)")
+    for label, fn in (("by-range", attribute_by_range), ("by-scope", attribute_by_scope)):
+        start = time.perf_counter()
+        pairs = fn(defs, calls)
+        print(f"{label:<9} {time.perf_counter() - start:8.3f}s  {len(pairs):>8} caller/call pairs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from backend.parser_engine import RECEIVER, CodeParser
+from benchmarks.synthetic import javascript_source, python_source
+
+FIXTURES = {
+    "python": ("fixture.py", lambda n, seed: python_source(n, nesting=2, seed=seed)),
+    "javascript": ("fixture.js", lambda n, seed: javascript_source(n, nesting=2, seed=seed)),
+    "typescript": ("fixture.ts", lambda n, seed: javascript_source(n, nesting=2, seed=seed, typed=True)),
+    "tsx": ("fixture.tsx", lambda n, seed: javascript_source(n, nesting=2, seed=seed, typed=True, jsx=True)),
+}
+
+# Node kinds the recursive extraction matched on.
+FUNCTION_TYPES = ('function_definition', 'function_declaration', 'method_definition', 'arrow_function')
+CLASS_TYPES = ('class_definition', 'class_declaration', 'abstract_class_declaration', 'class')
+
+# The recursive extraction CodeParser used before the tree-sitter query, kept verbatim so
+# the speedup is measured against it on the same trees rather than against a bare walk.
+class LegacyExtractor:
+    def extract(self, root, code):
+        definitions, calls, imports = [], [], []
+        self._traverse(root, code, definitions, calls, imports)
+        return {"definitions": definitions, "calls": calls, "imports": imports}
+
+    def _traverse(self, node, code, definitions, calls, imports, scope=None, cls=None):
+        if node.type in FUNCTION_TYPES:
+            func_name = "anonymous"
+            name_node = node.child_by_field_name('name')
+            if not name_node and node.parent and node.parent.type == 'variable_declarator':
+                name_node = node.parent.child_by_field_name('name')
+            if not name_node and node.type == 'method_definition':
+                name_node = node.child_by_field_name('name')
+
+            if name_node:
+                func_name = code[name_node.start_byte:name_node.end_byte]
+                scope = f"{cls}.{func_name}" if cls else func_name
+                definitions.append({
+                    'name': func_name, 'qualname': scope, 'class': cls, 'start': node.start_point[0] + 1,
+                    'end': node.end_point[0] + 1, 'code': code[node.start_byte:node.end_byte]
+                })
+            cls = None
+        elif node.type in CLASS_TYPES:
+            name_node = node.child_by_field_name('name')
+            cls = code[name_node.start_byte:name_node.end_byte] if name_node else None
+        elif node.type in ['import_statement', 'import_from_statement']:
+            self._collect_imports(node, code, imports)
+
+        if node.type in ['call_expression', 'call']:
+            func_node = node.child_by_field_name('function')
+            if func_node:
+                if func_node.type == 'attribute' or func_node.type == 'member_expression':
+                    prop = func_node.child_by_field_name('attribute') or func_node.child_by_field_name('property')
+                    if prop:
+                        obj = func_node.child_by_field_name('object')
+                        receiver = code[obj.start_byte:obj.end_byte] if obj else None
+                        if receiver and not RECEIVER.match(receiver): receiver = '?'
+                        calls.append({'name': code[prop.start_byte:prop.end_byte], 'line': node.start_point[0]+1,
+                                      'caller': scope, 'receiver': receiver})
+                elif func_node.type == 'identifier':
+                    func_name = code[func_node.start_byte:func_node.end_byte]
+                    calls.append({'name': func_name, 'line': node.start_point[0]+1, 'caller': scope, 'receiver': None})
+                    if func_name == 'require': self._collect_require(node, code, imports)
+
+        for child in node.children:
+            self._traverse(child, code, definitions, calls, imports, scope, cls)
+
+    def _collect_imports(self, node, code, imports):
+        text = lambda n: code[n.start_byte:n.end_byte]
+        source = node.child_by_field_name('source')
+        if source:
+            module = text(source)[1:-1]
+            clause = next((c for c in node.children if c.type == 'import_clause'), None)
+            for child in (clause.children if clause else []):
+                if child.type == 'identifier':
+                    imports.append({'alias': text(child), 'module': module, 'name': 'default'})
+                elif child.type == 'namespace_import':
+                    alias = next((c for c in child.children if c.type == 'identifier'), None)
+                    if alias: imports.append({'alias': text(alias), 'module': module, 'name': None})
+                elif child.type == 'named_imports':
+                    for spec in child.children:
+                        if spec.type != 'import_specifier': continue
+                        name = spec.child_by_field_name('name')
+                        alias = spec.child_by_field_name('alias') or name
+                        imports.append({'alias': text(alias), 'module': module, 'name': text(name)})
+        elif node.type == 'import_statement':
+            for child in node.children_by_field_name('name'):
+                if child.type == 'aliased_import':
+                    module = text(child.child_by_field_name('name'))
+                    imports.append({'alias': text(child.child_by_field_name('alias')), 'module': module, 'name': None})
+                else:
+                    imports.append({'alias': text(child), 'module': text(child), 'name': None})
+        else:
+            module_node = node.child_by_field_name('module_name')
+            if not module_node: return
+            module = text(module_node)
+            if any(c.type == 'wildcard_import' for c in node.children):
+                imports.append({'alias': '*', 'module': module, 'name': '*'})
+            for child in node.children_by_field_name('name'):
+                if child.type == 'aliased_import':
+                    name = text(child.child_by_field_name('name'))
+                    imports.append({'alias': text(child.child_by_field_name('alias')), 'module': module, 'name': name})
+                else:
+                    imports.append({'alias': text(child), 'module': module, 'name': text(child)})
+
+    def _collect_require(self, node, code, imports):
+        text = lambda n: code[n.start_byte:n.end_byte]
+        args = node.child_by_field_name('arguments')
+        source = next((c for c in args.children if c.type == 'string'), None) if args else None
+        declarator = node.parent
+        if not source or not declarator or declarator.type != 'variable_declarator': return
+        module = text(source)[1:-1]
+        target = declarator.child_by_field_name('name')
+        if target.type == 'identifier':
+            imports.append({'alias': text(target), 'module': module, 'name': None})
+        elif target.type == 'object_pattern':
+            for child in target.children:
+                if child.type == 'shorthand_property_identifier_pattern':
+                    imports.append({'alias': text(child), 'module': module, 'name': text(child)})
+                elif child.type == 'pair_pattern':
+                    key, value = child.child_by_field_name('key'), child.child_by_field_name('value')
+                    if value.type == 'identifier':
+                        imports.append({'alias': text(value), 'module': module, 'name': text(key)})
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description="CodeParser throughput on generated Python, JS, TS and TSX fixtures.")
+    parser.add_argument("--functions", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.setrecursionlimit(100000)
+    code_parser = CodeParser()
+    legacy = LegacyExtractor()
+    with tempfile.TemporaryDirectory() as tmp:
+        for lang, (filename, generate) in FIXTURES.items():
+            path = os.path.join(tmp, filename)
+            source = generate(args.functions, 0)
+            with open(path, "w") as f:
+                f.write(source)
+            src = source.encode()
+            ts_ms, tree = best(lambda: code_parser.parsers[lang].parse(src), args.repeat)
+            assert not tree.root_node.has_error, f"{filename} does not parse cleanly"
+            def extract():
+                found = [], [], []
+                code_parser._traverse(tree.root_node, src, code_parser.queries[lang], *found)
+                return found
+            query_ms, (definitions, calls, _) = best(extract, args.repeat)
+            legacy_ms, old = best(lambda: legacy.extract(tree.root_node, source), args.repeat)
+            assert (len(old["definitions"]), len(old["calls"])) == (len(definitions), len(calls)), f"{lang}: extractors disagree"
+            total_ms, _ = best(lambda: code_parser.parse_file(path, tmp), args.repeat)
+            print(f"{lang:<11} {len(src) / 1024:7.0f} KB  {len(definitions):>6} defs  {len(calls):>6} calls  "
+                  f"tree-sitter {ts_ms:7.1f} ms  extraction: recursive {legacy_ms:7.1f} ms, query {query_ms:7.1f} ms "
+                  f"({legacy_ms / query_ms:4.1f}x)  parse_file {total_ms:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from backend.database import DatabaseManager
+from benchmarks.synthetic import populate_db
+
+SECONDARY_INDEXES = ["idx_edges_target", "idx_nodes_name", "idx_nodes_name_nocase", "idx_nodes_type_name", "idx_nodes_file_path", "idx_nodes_unsummarized"]
+
+# The query shapes used before the projected methods existed.
+def old_callers(db, node_id):
+    return db.conn.execute("SELECT * FROM edges WHERE target_id = ? AND type = 'calls'", (node_id,)).fetchall()
+
+def old_callees(db, node_id):
+    return db.conn.execute("SELECT * FROM edges WHERE source_id = ? AND type = 'calls'", (node_id,)).fetchall()
+
+def old_by_name(db, name):
+    return [n for n in db.get_all_nodes() if n['name'] == name and n['type'] == 'function']
+
+def old_unsummarized(db):
+    return [n['id'] for n in db.get_all_nodes() if n['type'] == 'function' and not n['summary']]
+
+def old_function_index(db):
+    return [(n['id'], n['name']) for n in db.get_all_nodes() if n['type'] == 'function']
+
+def old_prefix(db, prefix):
+    return db.conn.execute("""SELECT id, name FROM nodes WHERE type = 'function' AND name LIKE ?
+        ORDER BY length(name), name LIMIT 80""", (prefix + '%',)).fetchall()
+
+def new_prefix(db, prefix):
+    return db.conn.execute("""SELECT id, name FROM nodes INDEXED BY idx_nodes_name_nocase
+        WHERE name >= ?1 COLLATE NOCASE AND name < ?2 COLLATE NOCASE AND type = 'function'
+        ORDER BY length(name), name LIMIT 80""", (prefix, prefix + '\U0010ffff')).fetchall()
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat): fn()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description="Common lookups before and after secondary indexes and projected queries.")
+    parser.add_argument("--functions", type=int, default=250000)
+    parser.add_argument("--fanout", type=int, default=4, help="calls per function; 250k x 4 = 1M call edges")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        print(f"Building {args.functions} functions x {args.fanout} calls...")
+        ids = populate_db(db, args.functions, fanout=args.fanout)
+        rng = random.Random(3)
+        probe = rng.choice(ids)
+        name = probe.split("::")[1]
+        cases = [
+            ("callers of id", lambda: old_callers(db, probe), lambda: db.get_callers(probe), 200),
+            ("callees of id", lambda: old_callees(db, probe), lambda: db.get_callees(probe), 200),
+            ("functions by name", lambda: old_by_name(db, name), lambda: db.get_functions_by_name(name), 3),
+            ("names by prefix", lambda: old_prefix(db, name[:-2]), lambda: new_prefix(db, name[:-2]), 20),
+            ("unsummarized ids", lambda: old_unsummarized(db), lambda: db.get_unsummarized_function_ids(), 3),
+            ("linker name index", lambda: old_function_index(db), lambda: db.get_function_index(), 3),
+        ]
+        results = [(label, new, repeat) for label, _, new, repeat in cases]
+        after = {label: timed(new, repeat) for label, new, repeat in results}
+        for index in SECONDARY_INDEXES: db.conn.execute(f"DROP INDEX {index}")
+        before = {label: timed(old, repeat) for label, old, _, repeat in cases}
+        print(f"{'query':<20} {'before':>12} {'after':>12} {'speedup':>9}")
+        for label, _, _, _ in cases:
+            print(f"{label:<20} {before[label] * 1e3:10.2f}ms {after[label] * 1e3:10.2f}ms {before[label] / after[label]:8.1f}x")
+        db.conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import threading
+import time
+from backend.database import DatabaseManager
+from benchmarks.synthetic import populate_db
+
+def reader(db, lock, ids, reads, seed, latencies):
+    rng = random.Random(seed)
+    for _ in range(reads):
+        node_id = rng.choice(ids)
+        start = time.perf_counter()
+        with lock:
+            db.get_node_code(node_id)
+            db.get_callees(node_id)
+            db.search_functions(node_id.split("::")[1][:7], 20)
+        latencies.append(time.perf_counter() - start)
+
+# Summaries landing in batches, as from run_setup.py or watch mode, on a separate connection.
+def writer(db_path, ids, stop):
+    db = DatabaseManager(db_path)
+    rng = random.Random(1)
+    while not stop.is_set():
+        db.update_summaries([(i, f"summary {rng.random()}") for i in rng.sample(ids, 50)])
+        time.sleep(0.005)
+
+def run(db, lock, db_path, ids, threads, reads):
+    latencies, stop = [], threading.Event()
+    background = threading.Thread(target=writer, args=(db_path, ids, stop))
+    background.start()
+    workers = [threading.Thread(target=reader, args=(db, lock, ids, reads, s, latencies)) for s in range(threads)]
+    start = time.perf_counter()
+    for t in workers: t.start()
+    for t in workers: t.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    background.join()
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1e3
+    return len(latencies) / elapsed, pct(0.5), pct(0.95), pct(0.99)
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent dashboard reads during writes: one shared connection vs the read pool.")
+    parser.add_argument("--functions", type=int, default=50000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--reads", type=int, default=300, help="page loads per thread")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        ids = populate_db(DatabaseManager(db_path), args.functions)
+        modes = (("shared connection", DatabaseManager(db_path, read_pool_size=0), threading.Lock()),
+                 ("read pool", DatabaseManager(db_path), contextlib.nullcontext()))
+        for label, db, lock in modes:
+            rate, p50, p95, p99 = run(db, lock, db_path, ids, args.threads, args.reads)
+            print(f"{label:<18} {args.threads} threads  {rate:8.0f} loads/s  "
+                  f"p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  p99 {p99:6.2f} ms")
+
+if __name__ == "__main__":
+    main()
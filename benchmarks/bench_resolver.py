@@ -0,0 +1,57 @@
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from backend.database import DatabaseManager
+from backend.orchestrator import RepositoryOrchestrator
+from backend.resolver import Linker
+from benchmarks.synthetic import write_python_package
+
+def legacy_edges(db, calls):
+    # The original Linker.match_call: bare name, same-file preference, else the first candidate.
+    global_map = {}
+    for row in db.get_function_index(): global_map.setdefault(row['name'], []).append(row['id'])
+    edges = set()
+    for call in calls:
+        candidates = global_map.get(call['name'], [])
+        if not candidates: continue
+        local_id = f"{call['file_path']}::{call['name']}"
+        edges.add((call['caller_id'], local_id if local_id in candidates else candidates[0]))
+    return edges
+
+def resolved_edges(db, calls):
+    linker = Linker(db)
+    linker.prepare()
+    edges = set()
+    for call in calls:
+        target = linker.resolve(call)
+        if target: edges.add((call['caller_id'], target))
+    return edges
+
+def score(label, edges, truth, elapsed, calls):
+    correct = len(edges & truth)
+    precision = correct / len(edges) if edges else 0.0
+    print(f"{label:<9} {len(calls) / elapsed:10.0f} calls/s  edges {len(edges):>6}  "
+          f"precision {precision:6.1%}  recall {correct / len(truth):6.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Call resolution throughput and precision on a generated package.")
+    parser.add_argument("--modules", type=int, default=500)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = os.path.join(tmp, "repo")
+        truth = write_python_package(repo, args.modules)
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            RepositoryOrchestrator(repo, db=db).scan()
+        calls = db.conn.execute("SELECT * FROM calls").fetchall()
+        for label, fn in (("bare-name", legacy_edges), ("resolver", resolved_edges)):
+            start = time.perf_counter()
+            edges = fn(db, calls)
+            score(label, edges, truth, time.perf_counter() - start, calls)
+        db.conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from backend.database import DatabaseManager
+from backend.orchestrator import RepositoryOrchestrator
+from benchmarks.synthetic import write_source_tree
+
+def scan(repo, db_path, workers, results):
+    db = DatabaseManager(db_path)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        RepositoryOrchestrator(repo, db=db).scan(workers=workers)
+    edges = db.conn.execute("SELECT COUNT(*) FROM edges WHERE type = 'calls'").fetchone()[0]
+    # ru_maxrss is in KiB on Linux; this is the scanning process only, not pool workers.
+    results.put((time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, edges))
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of a full scan as the source tree grows.")
+    parser.add_argument("--sizes", default="4,16,64", help="comma-separated tree sizes in MB, e.g. 1024 for 1 GB")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    ctx = multiprocessing.get_context("spawn")
+    for size in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            repo = os.path.join(tmp, "repo")
+            files, written = write_source_tree(repo, size)
+            results = ctx.Queue()
+            proc = ctx.Process(target=scan, args=(repo, os.path.join(tmp, "bench.db"), args.workers, results))
+            proc.start()
+            elapsed, peak, edges = results.get()
+            proc.join()
+        print(f"{written / (1 << 20):7.0f} MB  {files:>6} files  {edges:>9} edges  "
+              f"{elapsed:8.1f}s  {written / (1 << 20) / elapsed:6.2f} MB/s  peak RSS {peak:7.1f} MB")
+
+if __name__ == "__main__":
+    main()
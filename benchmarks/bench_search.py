@@ -0,0 +1,36 @@
+import argparse
+import os
+import tempfile
+import time
+from backend.database import DatabaseManager
+from benchmarks.synthetic import populate_db
+
+QUERIES = ["func_1234", "unc_99", "fnuc_1234", "mod_7", "fu", "_1", "nothing_matches"]
+
+def scan_filter(db, query):
+    # The original sidebar: load every node, build labels and substring-filter them in Python.
+    labels = {f"{os.path.basename(n['file_path'])} :: {n['name']}": n['id'] for n in db.get_all_nodes() if n['type'] == 'function'}
+    return [k for k in labels if query.lower() in k.lower()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Sidebar search: full node scan vs the indexed search API.")
+    parser.add_argument("--functions", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        populate_db(db, args.functions)
+        print(f"{'query':<16} {'full scan':>12} {'indexed':>12}  top match")
+        for query in QUERIES:
+            start = time.perf_counter()
+            scan_filter(db, query)
+            scan = time.perf_counter() - start
+            start = time.perf_counter()
+            rows = db.search_functions(query, args.limit)
+            indexed = time.perf_counter() - start
+            top = rows[0]['name'] if rows else '-'
+            print(f"{query:<16} {scan * 1e3:10.1f}ms {indexed * 1e3:10.1f}ms  {top}")
+        db.conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from backend.database import DatabaseManager
+from backend.graph_service import GraphService
+from backend.snapshot import SnapshotStore, export_snapshot, import_snapshot
+from benchmarks.synthetic import populate_db
+
+# Memory is taken once the reachability index exists, as it does after the first
+# impact view; "reach" is that first get_reach call, which builds the index.
+def load(label, open_db, backend, sample):
+    tracemalloc.start()
+    probe = GraphService(db=open_db(), backend=backend)
+    probe.get_context_for_function(sample[0])
+    probe.get_reach(sample[0])
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del probe
+    start = time.perf_counter()
+    service = GraphService(db=open_db(), backend=backend)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    service.get_context_for_function(sample[0])
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    service.get_reach(sample[0])
+    reach = time.perf_counter() - start
+    start = time.perf_counter()
+    for node_id in sample: service.get_context_for_function(node_id)
+    context = (time.perf_counter() - start) / len(sample)
+    start = time.perf_counter()
+    service.get_full_graph_data()
+    full = time.perf_counter() - start
+    print(f"{label:<20} startup {elapsed * 1000:7.1f} ms  first context {first * 1000:6.1f} ms  reach {reach * 1000:7.1f} ms  "
+          f"memory {memory / 2**20:6.1f} MiB  context {context * 1e6:6.1f} us  full graph {full:5.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="GraphService startup from SQLite vs a memory-mapped snapshot.")
+    parser.add_argument("--functions", type=int, default=100000)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--code-size", type=int, default=400, help="bytes of code per function")
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path, snap_path = os.path.join(tmp, "bench.db"), os.path.join(tmp, "bench.owlsnap")
+        db = DatabaseManager(db_path)
+        ids = populate_db(db, args.functions, fanout=args.fanout, code_size=args.code_size)
+        db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        start = time.perf_counter()
+        export_snapshot(db, snap_path)
+        print(f"{args.functions} functions: database {os.path.getsize(db_path) / 2**20:.1f} MiB, "
+              f"snapshot {os.path.getsize(snap_path) / 2**20:.1f} MiB, exported in {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        import_snapshot(snap_path, DatabaseManager(os.path.join(tmp, "imported.db")))
+        print(f"imported back into SQLite in {time.perf_counter() - start:.2f}s")
+        db.close()
+
+        sample = random.Random(1).sample(ids, min(args.queries, len(ids)))
+        load("sqlite -> networkx", lambda: DatabaseManager(db_path), "networkx", sample)
+        load("sqlite -> compact", lambda: DatabaseManager(db_path), "compact", sample)
+        load("snapshot -> mapped", lambda: SnapshotStore(snap_path), "mapped", sample)
+
+if __name__ == "__main__":
+    main()
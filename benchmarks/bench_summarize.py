@@ -0,0 +1,51 @@
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from backend.ai_engine import SeniorEngineerAI
+from backend.database import DatabaseManager
+from backend.stub_client import StubMistral
+from backend.summarizer import SummaryEngine
+
+def seed(db, n):
+    db.upsert_nodes([{
+        "id": f"pkg/mod.py::func_{i}", "name": f"func_{i}", "type": "function",
+        "file_path": "pkg/mod.py", "start_line": i, "end_line": i,
+        "code": f"def func_{i}():\n    return {i}\n"
+    } for i in range(n)])
+
+def run(label, n, latency, failure_rate, **engine_args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        seed(db, n)
+        client = StubMistral(latency=latency, failure_rate=failure_rate)
+        engine = SummaryEngine(SeniorEngineerAI(client=client), db, backoff=0.01, **engine_args)
+        nodes = db.get_all_nodes()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = engine.run(nodes)
+        cold = time.perf_counter() - start
+        # reset() keeps summary_cache, so the second pass is served entirely from it.
+        db.reset()
+        seed(db, n)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            warm_stats = SummaryEngine(SeniorEngineerAI(client=client), db, **engine_args).run(db.get_all_nodes())
+        warm = time.perf_counter() - start
+        db.conn.close()
+    print(f"{label:<14} cold {cold:7.2f}s ({n / cold:7.1f} fn/s, {stats['retries']} retries, {stats['failed']} failed)"
+          f"  warm {warm:6.3f}s ({warm_stats['cached']} cache hits)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarization throughput against the offline stub client.")
+    parser.add_argument("--functions", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per request")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    args = parser.parse_args()
+    for label, concurrency in (("sequential", 1), ("concurrency=16", 16)):
+        run(label, args.functions, args.latency, args.failure_rate, concurrency=concurrency, rate=0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from backend.database import DatabaseManager
+from backend.graph_service import GraphService
+from backend.orchestrator import RepositoryOrchestrator
+from backend.watcher import watch
+from benchmarks.synthetic import write_python_package
+
+def main():
+    parser = argparse.ArgumentParser(description="Save-to-GraphService latency of watch mode for single-file edits.")
+    parser.add_argument("--modules", type=int, default=500)
+    parser.add_argument("--edits", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = os.path.join(tmp, "repo")
+        write_python_package(repo, args.modules)
+        db_path = os.path.join(tmp, "bench.db")
+        orchestrator = RepositoryOrchestrator(repo, db=DatabaseManager(db_path))
+        with contextlib.redirect_stdout(io.StringIO()): orchestrator.scan()
+        service = GraphService(db=DatabaseManager(db_path))
+
+        stop = threading.Event()
+        log = io.StringIO()
+        def run():
+            with contextlib.redirect_stdout(log): watch(orchestrator, interval=args.interval, stop=stop)
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        time.sleep(0.5)
+
+        latencies = []
+        for k in range(args.edits):
+            module = rng.randrange(args.modules)
+            with open(os.path.join(repo, "app", f"mod_{module}.py"), "a") as f:
+                f.write(f"\n\ndef added_{k}():\n    return get()\n")
+            saved = time.perf_counter()
+            node_id = f"app/mod_{module}.py::added_{k}"
+            while True:
+                service.refresh()
+                context = service.get_context_for_function(node_id)
+                if context and context['dependencies']: break
+                time.sleep(0.01)
+            latencies.append(time.perf_counter() - saved)
+        stop.set()
+        thread.join()
+        latencies.sort()
+        print(f"{args.modules} modules, {args.edits} single-file edits, poll interval {args.interval}s")
+        print(f"save -> linked in GraphService: p50 {statistics.median(latencies) * 1000:.0f} ms  "
+              f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms  max {latencies[-1] * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
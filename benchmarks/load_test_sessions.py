@@ -0,0 +1,49 @@
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from backend.database import DatabaseManager
+from backend.graph_service import GraphService
+from benchmarks.synthetic import populate_db
+
+def session(service, ids, pages, seed, latencies):
+    rng = random.Random(seed)
+    # Sessions mostly revisit a small working set of functions, like engineers browsing one area.
+    working_set = rng.sample(ids, min(50, len(ids)))
+    for _ in range(pages):
+        node_id = rng.choice(working_set) if rng.random() < 0.8 else rng.choice(ids)
+        start = time.perf_counter()
+        service.refresh()
+        service.get_context_for_function(node_id)
+        latencies.append(time.perf_counter() - start)
+
+def run(service, ids, sessions, pages):
+    latencies = []
+    threads = [threading.Thread(target=session, args=(service, ids, pages, s, latencies)) for s in range(sessions)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1e3
+    return len(latencies) / elapsed, pct(0.5), pct(0.95), pct(0.99)
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard sessions against one shared GraphService.")
+    parser.add_argument("--functions", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=30)
+    parser.add_argument("--pages", type=int, default=200, help="page renders per session")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        ids = populate_db(DatabaseManager(db_path), args.functions)
+        for label, cache_size in (("no cache", 0), ("lru cache", 1024)):
+            service = GraphService(db=DatabaseManager(db_path), cache_size=cache_size)
+            rate, p50, p95, p99 = run(service, ids, args.sessions, args.pages)
+            print(f"{label:<10} {args.sessions} sessions  {rate:9.0f} pages/s  "
+                  f"p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  p99 {p99:6.2f} ms")
+
+if __name__ == "__main__":
+    main()
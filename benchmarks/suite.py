@@ -0,0 +1,165 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from backend.ai_engine import SeniorEngineerAI
+from backend.database import DatabaseManager
+from backend.graph_service import GraphService
+from backend.orchestrator import RepositoryOrchestrator
+from backend.parser_engine import CodeParser
+from backend.stub_client import StubMistral
+from benchmarks.synthetic import REPO_LANGUAGES, write_repo
+
+BASELINE = "data/benchmarks/baseline.json"
+SIZES = {
+    "small": dict(files=60, functions=10),
+    "medium": dict(files=300, functions=20),
+    "large": dict(files=1500, functions=20),
+}
+QUESTION = "What does this function do with its value and which helpers does it rely on?"
+
+def measure(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn(state) if setup else fn()
+        times.append(time.perf_counter() - start)
+    return {"ms": statistics.median(times) * 1000, "min_ms": min(times) * 1000}
+
+def quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()): return fn(*args, **kwargs)
+
+def commit():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError: return None
+
+# Every case runs against the same generated repository; AI calls go to the offline stub.
+def run_suite(params, repeat, backend, samples=200):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = os.path.join(tmp, "repo")
+        results["repo"] = write_repo(repo, **params)
+        print(f"Repository: {results['repo']['files']} files, {results['repo']['functions']} functions, "
+              f"{results['repo']['calls']} calls, {results['repo']['bytes'] / 1024:.0f} KB")
+        cases = results["cases"] = {}
+
+        code_parser = CodeParser()
+        for lang, ext in REPO_LANGUAGES.items():
+            paths = [os.path.join(root, f) for root, _, files in os.walk(repo) for f in files if f.endswith(ext)]
+            if not paths: continue
+            case = measure(lambda: [code_parser.parse_file(p, repo) for p in paths], repeat)
+            cases[f"parse_file.{lang}"] = {k: v / len(paths) for k, v in case.items()}
+
+        runs = iter(range(repeat + 1))
+        def fresh_db():
+            return RepositoryOrchestrator(repo, db=DatabaseManager(os.path.join(tmp, f"scan_{next(runs)}.db")))
+        cases["scan.full"] = measure(lambda o: quiet(o.scan, full=True), repeat, fresh_db)
+
+        db_path = os.path.join(tmp, "bench.db")
+        orchestrator = RepositoryOrchestrator(repo, db=DatabaseManager(db_path))
+        quiet(orchestrator.scan)
+        cases["scan.unchanged"] = measure(lambda: quiet(orchestrator.scan), repeat)
+
+        cases["graph.refresh.cold"] = measure(lambda: GraphService(db=DatabaseManager(db_path), backend=backend), repeat)
+        service = GraphService(db=DatabaseManager(db_path), backend=backend, cache_size=0)
+
+        rng = random.Random(0)
+        rel_paths = sorted(os.path.relpath(os.path.join(root, f), repo) for root, _, files in os.walk(repo) for f in files)
+        def edit_one():
+            rel_path = rng.choice(rel_paths)
+            with open(os.path.join(repo, rel_path), "a") as f:
+                f.write(f"\ndef added_{rng.randrange(1 << 30)}(value):\n    return value\n" if rel_path.endswith(".py")
+                        else f"\nexport function added_{rng.randrange(1 << 30)}(value) {{ return value; }}\n")
+            return rel_path
+        cases["update.one_file"] = measure(lambda rel_path: quiet(orchestrator.update, {rel_path}), repeat, edit_one)
+        cases["graph.refresh.incremental"] = measure(lambda _: service.refresh(),
+                                                     repeat, lambda: quiet(orchestrator.update, {edit_one()}))
+
+        ids = [n for n, attrs in service.graph.nodes(data=True) if attrs.get('type') == 'function']
+        ids = rng.sample(ids, min(samples, len(ids)))
+        service.get_context_for_function(ids[0])
+        case = measure(lambda: [service.get_context_for_function(i) for i in ids], repeat)
+        cases["graph.context"] = {k: v / len(ids) for k, v in case.items()}
+        cases["graph.full_graph_data"] = measure(service.get_full_graph_data, repeat)
+
+        ai = SeniorEngineerAI(client=StubMistral())
+        contexts = [service.get_context_for_function(i) for i in ids]
+        case = measure(lambda: [ai.ask_with_context(QUESTION, c) for c in contexts], repeat)
+        cases["chat.stub_answer"] = {k: v / len(contexts) for k, v in case.items()}
+    return results
+
+# Cases are compared on their fastest run, the least noisy statistic. A case regresses
+# when it is both `threshold` slower in relative terms and `min_ms` slower in absolute
+# terms, so sub-millisecond jitter never fails a comparison.
+def compare(current, baseline, threshold, min_ms):
+    if current["params"] != baseline["params"]:
+        print(f"WARNING: baseline was recorded with {baseline['params']}, this run used {current['params']}.")
+    regressions = []
+    print(f"{'case':<28} {'baseline':>11} {'current':>11} {'change':>8}")
+    for name, case in current["cases"].items():
+        before = baseline["cases"].get(name)
+        if not before:
+            print(f"{name:<28} {'-':>11} {case['min_ms']:>9.2f}ms {'new':>8}")
+            continue
+        change = case["min_ms"] / before["min_ms"] - 1 if before["min_ms"] else 0.0
+        regressed = change > threshold and case["min_ms"] - before["min_ms"] > min_ms
+        if regressed: regressions.append(name)
+        print(f"{name:<28} {before['min_ms']:>9.2f}ms {case['min_ms']:>9.2f}ms {change:>+7.0%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite on a generated repository, compared against a saved baseline.")
+    parser.add_argument("--size", choices=SIZES, default="medium")
+    parser.add_argument("--files", type=int)
+    parser.add_argument("--functions", type=int, help="top-level functions per file")
+    parser.add_argument("--fanout", type=int, default=3, help="calls per function body")
+    parser.add_argument("--nesting", type=int, default=1, help="inner functions nested in each function")
+    parser.add_argument("--imports", type=int, default=3, help="modules each file imports from")
+    parser.add_argument("--backend", default="networkx", help="GraphService backend")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file to compare against or --save to")
+    parser.add_argument("--save", action="store_true", help="record this run as the new baseline instead of comparing")
+    parser.add_argument("--output", help="also write this run's results to a file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown that counts as a regression")
+    parser.add_argument("--min-ms", type=float, default=0.5, help="ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    params = dict(SIZES[args.size], fanout=args.fanout, nesting=args.nesting, imports=args.imports)
+    if args.files: params["files"] = args.files
+    if args.functions: params["functions"] = args.functions
+    results = run_suite(params, args.repeat, args.backend)
+    current = {"commit": commit(), "python": platform.python_version(), "machine": platform.machine(),
+               "backend": args.backend, "params": params, **results}
+
+    if args.save or not os.path.exists(args.baseline):
+        print(f"{'case':<28} {'median':>11} {'fastest':>11}")
+        for name, case in current["cases"].items(): print(f"{name:<28} {case['ms']:>9.2f}ms {case['min_ms']:>9.2f}ms")
+    for path in filter(None, [args.output, args.baseline if args.save else None]):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Results written to {path}")
+    if args.save: return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --save.")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print(f"Comparing against {args.baseline} (commit {baseline.get('commit')})")
+    regressions = compare(current, baseline, args.threshold, args.min_ms)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regressions.")
+
+if __name__ == "__main__":
+    main()
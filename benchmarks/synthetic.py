@@ -0,0 +1,190 @@
+import os
+import random
+
+def python_source(num_functions, calls_per_function=3, nesting=1, seed=0, prefix="func"):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(num_functions):
+        indent = ""
+        for depth in range(nesting + 1):
+            name = f"{prefix}_{i}" if depth == 0 else f"{prefix}_{i}_inner_{depth}"
+            lines.append(f"{indent}def {name}(value):")
+            indent += "    "
+            for _ in range(calls_per_function):
+                lines.append(f"{indent}value = {prefix}_{rng.randrange(num_functions)}(value)")
+        for depth in range(nesting, 0, -1):
+            indent = "    " * depth
+            lines.append(f"{indent}return {prefix}_{i}_inner_{depth}(value)")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+# JavaScript flavour of python_source; `typed` adds TypeScript annotations and `jsx`
+# returns an element from each function so the output exercises the TSX grammar.
+def javascript_source(num_functions, calls_per_function=3, nesting=1, seed=0, prefix="func", typed=False, jsx=False):
+    rng = random.Random(seed)
+    param = "value: number" if typed else "value"
+    lines = []
+    for i in range(num_functions):
+        indent = ""
+        for depth in range(nesting + 1):
+            name = f"{prefix}_{i}" if depth == 0 else f"{prefix}_{i}_inner_{depth}"
+            lines.append(f"{indent}function {name}({param}) {{" if depth == 0 else f"{indent}const {name} = ({param}) => {{")
+            indent += "    "
+            for _ in range(calls_per_function):
+                lines.append(f"{indent}value = {prefix}_{rng.randrange(num_functions)}(value);")
+        for depth in range(nesting, 0, -1):
+            lines.append(f"{'    ' * depth}}};")
+            lines.append(f"{'    ' * depth}return {prefix}_{i}_inner_{depth}(value);")
+        if jsx: lines.append("    return <div>{value}</div>;")
+        lines.append("}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+# With `acyclic`, every call points at a later function, giving a layered DAG like
+# most real call graphs instead of one giant cycle.
+def populate_db(db, num_functions, fanout=4, files=None, seed=0, code_size=200, acyclic=False):
+    rng = random.Random(seed)
+    files = files or max(1, num_functions // 20)
+    ids = [f"pkg_{i % 10}/mod_{i % files}.py::func_{i}" for i in range(num_functions)]
+    body = "    pass\n" * max(1, code_size // 9)
+    with db.session():
+        db.upsert_nodes([{
+            "id": node_id, "name": node_id.split("::")[1], "type": "function",
+            "file_path": node_id.split("::")[0], "start_line": 1, "end_line": 10,
+            "code": f"def {node_id.split('::')[1]}():\n{body}"
+        } for node_id in ids])
+        db.add_edges([(node_id.split("::")[0], node_id, "defines") for node_id in ids])
+        target = (lambda i: rng.randrange(i + 1, num_functions)) if acyclic else (lambda i: rng.randrange(num_functions))
+        db.add_edges([(node_id, ids[target(i)], "calls") for i, node_id in enumerate(ids[:-1] if acyclic else ids)
+                      for _ in range(fanout)])
+    return ids
+
+# Writes an `app` package whose cross-module calls are known and returns the true call edges.
+def write_python_package(root, modules=50, seed=0):
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(root, "app"), exist_ok=True)
+    open(os.path.join(root, "app", "__init__.py"), "w").close()
+    truth = set()
+    for i in range(modules):
+        j, k, l = (rng.randrange(modules) for _ in range(3))
+        path = f"app/mod_{i}.py"
+        node = lambda m, qual: f"app/mod_{m}.py::{qual}"
+        source = f"""from app.mod_{j} import helper_{j}
+from app import mod_{k}
+from app.mod_{l} import Service_{l}
+
+
+class Service_{i}:
+    def run(self):
+        self.get()
+        helper_{j}()
+        mod_{k}.get()
+        Service_{l}.build()
+
+    def get(self):
+        return local_{i}()
+
+    @staticmethod
+    def build():
+        return 1
+
+
+def get():
+    return 1
+
+
+def local_{i}():
+    return get()
+
+
+def helper_{i}():
+    return len([])
+"""
+        with open(os.path.join(root, path), "w") as f:
+            f.write(source)
+        run = node(i, f"Service_{i}.run")
+        truth |= {(run, node(i, f"Service_{i}.get")), (run, node(j, f"helper_{j}")),
+                  (run, node(k, "get")), (run, node(l, f"Service_{l}.build")),
+                  (node(i, f"Service_{i}.get"), node(i, f"local_{i}")), (node(i, f"local_{i}"), node(i, "get"))}
+    return truth
+
+# Writes generated modules under `root` until they add up to `size_mb`; returns (files, bytes).
+def write_source_tree(root, size_mb, functions_per_file=200, files_per_dir=100, seed=0):
+    target = size_mb * (1 << 20)
+    files = written = 0
+    while written < target:
+        directory = os.path.join(root, f"pkg_{files // files_per_dir}")
+        os.makedirs(directory, exist_ok=True)
+        source = python_source(functions_per_file, seed=seed + files, prefix=f"m{files}")
+        with open(os.path.join(directory, f"mod_{files}.py"), "w") as f:
+            f.write(source)
+        files += 1
+        written += len(source)
+    return files, written
+
+REPO_LANGUAGES = {"python": ".py", "javascript": ".js", "typescript": ".ts"}
+
+def _repo_function(lang, name, nesting, fanout, pick):
+    python = lang == "python"
+    param = "value: number" if lang == "typescript" else "value"
+    lines, indent = [], ""
+    for depth in range(nesting + 1):
+        inner = name if depth == 0 else f"{name}_inner_{depth}"
+        if python: lines.append(f"{indent}def {inner}(value):")
+        elif depth == 0: lines.append(f"export function {inner}({param}) {{")
+        else: lines.append(f"{indent}const {inner} = ({param}) => {{")
+        indent += "    "
+        for _ in range(fanout):
+            lines.append(f"{indent}value = {pick()}(value)" + ("" if python else ";"))
+    for depth in range(nesting, 0, -1):
+        indent = "    " * depth
+        if not python: lines.append(f"{indent}}};")
+        lines.append(f"{indent}return {name}_inner_{depth}(value)" + ("" if python else ";"))
+    if not python: lines.append("}")
+    return lines
+
+# Writes a mixed Python / JavaScript / TypeScript repository: `files` modules of
+# `functions` top-level functions, each nesting `nesting` inner functions and making
+# `fanout` calls per level, half of them to functions imported from `imports` other
+# modules of the same language family. Returns counts of what was written.
+def write_repo(root, files=200, functions=20, fanout=3, nesting=1, imports=3, languages=tuple(REPO_LANGUAGES),
+               files_per_dir=50, seed=0):
+    rng = random.Random(seed)
+    langs = [languages[k % len(languages)] for k in range(files)]
+    families = {True: [], False: []}
+    for k, lang in enumerate(langs): families[lang == "python"].append(k)
+    totals = {"files": files, "functions": 0, "calls": 0, "bytes": 0}
+    for k, lang in enumerate(langs):
+        python = lang == "python"
+        family = families[python]
+        peers = [j for j in rng.sample(family, min(len(family), imports + 1)) if j != k][:imports]
+        used = {j: set() for j in peers}
+
+        def pick():
+            if peers and rng.random() < 0.5:
+                j = rng.choice(peers)
+                name = f"m{j}_f{rng.randrange(functions)}"
+                used[j].add(name)
+                return name
+            return f"m{k}_f{rng.randrange(functions)}"
+
+        body = []
+        for i in range(functions):
+            body.extend(_repo_function(lang, f"m{k}_f{i}", nesting, fanout, pick))
+            body.append("")
+        header = []
+        for j in peers:
+            if not used[j]: continue
+            names = ", ".join(sorted(used[j]))
+            module = f"pkg_{j // files_per_dir}/mod_{j}"
+            if python: header.append(f"from {module.replace('/', '.')} import {names}")
+            else: header.append(f"import {{ {names} }} from '../{module}';")
+        source = "\n".join(header + [""] + body) + "\n"
+        path = os.path.join(root, f"pkg_{k // files_per_dir}", f"mod_{k}{REPO_LANGUAGES[lang]}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(source)
+        totals["functions"] += functions * (nesting + 1)
+        totals["calls"] += functions * ((nesting + 1) * fanout + nesting)
+        totals["bytes"] += len(source)
+    return totals
@@ -4,10 +4,17 @@ import os
 import random
 from streamlit_agraph import agraph, Node, Edge, Config
 from backend.graph_service import GraphService
+from backend.database import DB_PATH
 from backend.ai_engine import SeniorEngineerAI
+from backend.repositories import DEFAULT_REPO, indexed_repositories, open_index
+from backend.snapshot import SNAPSHOT_SUFFIX
 
 st.set_page_config(page_title="Owlset", layout="wide")
 
+SEARCH_LIMIT = 50
+MAP_NODE_LIMIT = 300
+LIVE_REFRESH_SECONDS = float(os.getenv("OWLSET_LIVE_REFRESH", "1"))
+
 st.markdown("""
 <style>
     .block-container {padding-top: 1rem;}
@@ -20,10 +27,44 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-if "graph_service" not in st.session_state: 
-    st.session_state.graph_service = GraphService()
-if "ai_engine" not in st.session_state: 
-    st.session_state.ai_engine = SeniorEngineerAI()
+# One database, graph and AI engine per repository, shared by every session viewing it.
+@st.cache_resource
+def get_database(db_path):
+    return open_index(db_path)
+
+@st.cache_resource
+def get_graph_service(db_path):
+    # Snapshots are served straight from the memory-mapped file.
+    backend = "mapped" if db_path.endswith(SNAPSHOT_SUFFIX) else os.getenv("OWLSET_GRAPH_BACKEND", "networkx")
+    return GraphService(db=get_database(db_path), backend=backend)
+
+@st.cache_resource
+def get_ai_engine(db_path):
+    return SeniorEngineerAI(db=get_database(db_path), context_budget=int(os.getenv("OWLSET_CONTEXT_TOKENS", "6000")))
+
+def switch_repository():
+    st.session_state.selected_node = None
+    st.session_state.messages = []
+    st.session_state.pop("graph_version", None)
+
+repositories = indexed_repositories() or {DEFAULT_REPO: DB_PATH}
+st.sidebar.title("Owlset")
+if len(repositories) > 1:
+    repo = st.sidebar.selectbox("Repository", list(repositories), key="repo", on_change=switch_repository)
+else:
+    repo = next(iter(repositories))
+graph_service = get_graph_service(repositories[repo])
+ai_engine = get_ai_engine(repositories[repo])
+
+# Picks up index changes (e.g. from `run_setup.py --watch`) and reruns the page when
+# the graph this session last rendered is out of date.
+@st.fragment(run_every=LIVE_REFRESH_SECONDS or None)
+def follow_index():
+    graph_service.refresh()
+    if st.session_state.setdefault("graph_version", graph_service.version) != graph_service.version:
+        st.session_state.graph_version = graph_service.version
+        st.rerun()
+
 if "selected_node" not in st.session_state: 
     st.session_state.selected_node = None
 if "current_node_id" not in st.session_state: 
@@ -38,16 +79,16 @@ def get_color_for_path(file_path):
     return f"#{r:02x}{g:02x}{b:02x}"
 
 with st.sidebar:
-    st.title("Owlset")
+    follow_index()
     st.divider()
 
     if st.button("Reload Database", use_container_width=True):
-        st.session_state.graph_service.refresh()
+        graph_service.refresh()
         st.rerun()
 
+    search = st.text_input("Search Function", placeholder="e.g. Auth...")
     try:
-        nodes = st.session_state.graph_service.db.get_all_nodes()
-        func_nodes = [n for n in nodes if n['type'] == 'function']
+        func_nodes = graph_service.search(search, limit=SEARCH_LIMIT)
     except Exception as e:
         st.error(f"Error loading nodes: {e}")
         func_nodes = []
@@ -58,8 +99,10 @@ with st.sidebar:
         label = f"{clean_file} :: {n['name']}"
         options[label] = n['id']
     
-    search = st.text_input("Search Function", placeholder="e.g. Auth...")
-    filtered = [k for k in options.keys() if search.lower() in k.lower()] if search else list(options.keys())
+    selected = graph_service.get_node(st.session_state.selected_node) if st.session_state.selected_node else None
+    if selected and selected['id'] not in options.values():
+        options[f"{os.path.basename(selected['file_path'])} :: {selected['name']}"] = selected['id']
+    filtered = list(options.keys())
     
     current_index = None
     if st.session_state.selected_node:
@@ -85,7 +128,7 @@ if st.session_state.selected_node:
     node_id = st.session_state.selected_node
     
     try:
-        ctx = st.session_state.graph_service.get_context_for_function(node_id)
+        ctx = graph_service.get_context_for_function(node_id)
     except Exception as e:
         st.error(f"Error loading function context: {e}")
         ctx = None
@@ -131,6 +174,18 @@ if st.session_state.selected_node:
                 else: 
                     st.caption("None")
 
+            # Transitive counts need the whole-graph reachability index, so they are only computed on request.
+            if st.toggle("Impact analysis", key=f"impact_{node_id}"):
+                reach = graph_service.get_reach(node_id)
+                if reach:
+                    st.caption(f"Transitively called by {reach['callers']} functions, reaches {reach['callees']} functions.")
+                    depth = st.slider("Max hops (0 = unlimited)", 0, 10, 0)
+                    impact = graph_service.get_impact(node_id, depth=depth or None, limit=SEARCH_LIMIT)
+                    for n in impact['nodes']:
+                        st.markdown(f"- `{n['name']}` in `{n['file']}` ({n['distance']} hops)")
+                    if impact['count'] > len(impact['nodes']):
+                        st.caption(f"... and {impact['count'] - len(impact['nodes'])} more")
+
             st.subheader("Focus Flow")
             g = graphviz.Digraph()
             g.attr(rankdir='LR', bgcolor='transparent', dpi='70')
@@ -168,17 +223,34 @@ if st.session_state.selected_node:
 
             if st.session_state.messages and st.session_state.messages[-1]["role"] == "user":
                 with st.chat_message("assistant"):
-                    with st.spinner("Thinking..."):
-                        try:
-                            res = st.session_state.ai_engine.ask_with_context(
-                                st.session_state.messages[-1]["content"], ctx
-                            )
-                        except Exception as e:
-                            res = f"Error communicating with AI: {str(e)}"
-                        
+                    try:
+                        res = ai_engine.ask_with_context(
+                            st.session_state.messages[-1]["content"], ctx, stream=True
+                        )
+                        if isinstance(res, str): st.markdown(res)
+                        else: res = st.write_stream(res)
+                    except Exception as e:
+                        res = f"Error communicating with AI: {str(e)}"
                         st.markdown(res)
-                        st.session_state.messages.append({"role": "assistant", "content": res})
+                    st.session_state.messages.append({"role": "assistant", "content": res})
 
 else:
     st.info("Select a function from the sidebar to analyze.")
 
+    st.subheader("Repository Map")
+    m1, m2, m3 = st.columns(3)
+    level = m1.selectbox("Group by", ["directory", "file", "function"])
+    rank = m2.selectbox("Rank by", ["degree", "pagerank"])
+    top_k = m3.slider("Show top", 10, MAP_NODE_LIMIT, 100)
+    overview = graph_service.get_graph_view(level, top_k=top_k, rank=rank, page_size=MAP_NODE_LIMIT)
+    clusters = [n['id'] for n in overview['nodes'] if n.get('cluster')]
+    cluster = st.selectbox("Drill into", clusters, index=None) if clusters else None
+    view = graph_service.get_graph_view(level, cluster, top_k, rank, page_size=MAP_NODE_LIMIT) if cluster else overview
+    agraph(
+        nodes=[Node(id=n['id'], label=n['label'], color=n['color'], title=n['title'], size=10 + min(n.get('size', 1), 40) // 2)
+               for n in view['nodes']],
+        edges=[Edge(source=e['source'], target=e['target'], width=min(e['weight'], 10)) for e in view['edges']],
+        config=Config(width=1000, height=600, directed=True, physics=True)
+    )
+    if view['total_nodes'] > len(view['nodes']):
+        st.caption(f"Showing {len(view['nodes'])} of {view['total_nodes']} nodes.")
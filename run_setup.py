@@ -1,30 +1,121 @@
 import os
+import time
+import argparse
+import threading
 from backend.orchestrator import RepositoryOrchestrator
 from backend.ai_engine import SeniorEngineerAI
 from backend.database import DatabaseManager
+from backend.metrics import Metrics, profiled
+from backend.repositories import REPO_PATH, REPOS_DIR, check_repositories, discover_repositories, repository, scan_repositories
+from backend.summarizer import SummaryEngine
+from backend.stub_client import StubMistral
+from backend.watcher import SummaryQueue, watch
 
-REPO_PATH = "./data/repo"
+REPORT_DIR = "./data/reports"
 
 def main():
-    if not os.path.exists(REPO_PATH) or not os.listdir(REPO_PATH):
-        print(f"WARNING: Paste code into '{REPO_PATH}'!")
+    parser = argparse.ArgumentParser(description="Index repositories and summarize their functions.")
+    parser.add_argument("--repo", action="append", metavar="[NAME=]PATH",
+                        help="repository to index, repeatable (default: data/repo and every directory in data/repos)")
+    parser.add_argument("--parallel", type=int, default=1, help="repositories to scan at once, each in its own process")
+    parser.add_argument("--full", action="store_true", help="ignore the file manifest and rebuild the whole index")
+    parser.add_argument("--workers", type=int, default=1, help="parser processes to use (0 = one per CPU core)")
+    parser.add_argument("--concurrency", type=int, default=8, help="summary requests in flight at once")
+    parser.add_argument("--rate", type=float, default=5.0, help="maximum summary requests per second (0 = unlimited)")
+    parser.add_argument("--retries", type=int, default=3, help="retries per summary with exponential backoff")
+    parser.add_argument("--stub-ai", action="store_true", help="use the offline stub client instead of Mistral")
+    parser.add_argument("--watch", action="store_true", help="keep running and re-index files as they change")
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between polls in watch mode")
+    parser.add_argument("--report", help="where to write the JSON run report (default: data/reports/run-<time>.json)")
+    parser.add_argument("--profile", help="write a cProfile dump of the run to this path")
+    parser.add_argument("--trace-memory", action="store_true", help="record allocation hot spots with tracemalloc")
+    args = parser.parse_args()
+
+    if args.repo:
+        repos = [repository(*reversed(r.split('=', 1))) for r in args.repo]
+        missing = [r.path for r in repos if not os.path.isdir(r.path)]
+        if missing:
+            print(f"WARNING: No such directory: {', '.join(missing)}")
+            return
+    else:
+        repos = discover_repositories()
+    if not repos:
+        print(f"WARNING: Paste code into '{REPO_PATH}' or a directory under '{REPOS_DIR}'!")
+        return
+    try:
+        check_repositories(repos)
+    except ValueError as e:
+        print(f"WARNING: {e}")
         return
 
-    print("1. Parsing...")
-    RepositoryOrchestrator(REPO_PATH).scan()
+    metrics = Metrics()
+    report = args.report or os.path.join(REPORT_DIR, f"run-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    try:
+        with profiled(metrics, args.profile, args.trace_memory), metrics.timer("run"):
+            run(args, repos, metrics)
+    finally:
+        print_report(metrics)
+        metrics.write(report)
+        print(f"Run report written to {report}")
+
+def run(args, repos, metrics):
+    if len(repos) == 1:
+        print("1. Parsing...")
+        orchestrators = [RepositoryOrchestrator(repos[0].path, db=DatabaseManager(repos[0].db_path, metrics=metrics))]
+        orchestrators[0].scan(full=args.full, workers=args.workers)
+    else:
+        print(f"1. Parsing {len(repos)} repositories ({args.parallel} at a time)...")
+        metrics.extra["repositories"] = scan_repositories(repos, args.full, args.workers, args.parallel)
+        orchestrators = [RepositoryOrchestrator(r.path, db=DatabaseManager(r.db_path, metrics=metrics)) for r in repos]
 
     print("2. Summarizing...")
-    db = DatabaseManager()
-    ai = SeniorEngineerAI()
-    nodes = [n for n in db.get_all_nodes() if n['type'] == 'function' and not n['summary']]
-    
-    print(f"   {len(nodes)} functions to process.")
-    for i, n in enumerate(nodes):
-        print(f"   [{i+1}/{len(nodes)}] {n['name']}...")
-        s = ai.summarize_function(n['code'], n['name'])
-        if s: db.update_summary(n['id'], s)
-    
+    ai = SeniorEngineerAI(client=StubMistral() if args.stub_ai else None)
+    for repo, orchestrator in zip(repos, orchestrators):
+        db = orchestrator.db
+        pending = db.get_unsummarized_function_ids()
+        print(f"   {len(pending)} functions to process" + (f" in {repo.name}." if len(repos) > 1 else "."))
+        if not ai.client:
+            print("   MISTRAL_API_KEY not set, skipping summaries.")
+            break
+        if pending:
+            engine = SummaryEngine(ai, db, concurrency=args.concurrency, rate=args.rate, retries=args.retries)
+            stats = engine.run(list(db.get_function_sources(pending)))
+            print(f"   {stats['summarized']} summarized, {stats['cached']} cached, {stats['failed']} failed.")
+
+    if args.watch:
+        print("3. Watching... Run: streamlit run main_app.py")
+        stop = threading.Event()
+        threads = []
+        for orchestrator in orchestrators:
+            summaries = None
+            if ai.client:
+                summaries = SummaryQueue(ai, orchestrator.db.db_path, concurrency=args.concurrency, rate=args.rate, retries=args.retries)
+                summaries.start()
+            threads.append(threading.Thread(target=watch, args=(orchestrator, summaries, args.interval), kwargs={"stop": stop}, daemon=True))
+        for t in threads: t.start()
+        try:
+            while any(t.is_alive() for t in threads): time.sleep(0.5)
+        except KeyboardInterrupt:
+            stop.set()
+            for t in threads: t.join()
+            print("\nStopped.")
+        return
+
     print("Done! Run: streamlit run main_app.py")
 
+def print_report(metrics):
+    report = metrics.report()
+    print("Stages:")
+    for name, stage in report["stages"].items():
+        print(f"   {name:<16} {stage['seconds']:>9.3f}s  x{stage['calls']}")
+    for name, rate in report["rates"].items():
+        print(f"   {name}: {rate:,.1f}")
+    for name, stats in report["latency"].items():
+        print(f"   {name}: p50 {stats['p50'] * 1000:.0f} ms, p90 {stats['p90'] * 1000:.0f} ms, p99 {stats['p99'] * 1000:.0f} ms")
+    if report["slowest_files"]:
+        print("Slowest files:")
+        for f in report["slowest_files"][:5]:
+            print(f"   {f['seconds'] * 1000:8.1f} ms  {f['bytes']:>9} B  {f['path']}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,38 @@
+import os
+import time
+import argparse
+from backend.database import DB_PATH, DatabaseManager
+from backend.repositories import DEFAULT_REPO, INDEX_DIR, indexed_repositories
+from backend.snapshot import SNAPSHOT_SUFFIX, export_snapshot, import_snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description="Export an index to a portable snapshot, or import one.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write a repository's index to a snapshot file")
+    export.add_argument("repo", nargs="?", default="default", help="repository name (see data/indexes; default: data/owlset.db)")
+    export.add_argument("-o", "--output", help=f"snapshot path (default: {INDEX_DIR}/<repo>{SNAPSHOT_SUFFIX})")
+    load = commands.add_parser("import", help="rebuild a repository database from a snapshot")
+    load.add_argument("snapshot")
+    load.add_argument("--repo", help="repository name to import as (default: the snapshot's file name)")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        db_path = indexed_repositories().get(args.repo)
+        if not db_path or db_path.endswith(SNAPSHOT_SUFFIX):
+            print(f"WARNING: No database for repository '{args.repo}'.")
+            return
+        output = args.output or os.path.join(INDEX_DIR, args.repo + SNAPSHOT_SUFFIX)
+        start = time.perf_counter()
+        header = export_snapshot(DatabaseManager(db_path), output)
+        print(f"Exported {header['nodes']} nodes and {header['edges']} edges from {db_path} to {output} "
+              f"({os.path.getsize(output) / 2**20:.1f} MiB, database {os.path.getsize(db_path) / 2**20:.1f} MiB) "
+              f"in {time.perf_counter() - start:.1f}s.")
+    else:
+        name = args.repo or os.path.splitext(os.path.basename(args.snapshot))[0]
+        db_path = DB_PATH if name == DEFAULT_REPO else os.path.join(INDEX_DIR, name + ".db")
+        start = time.perf_counter()
+        header = import_snapshot(args.snapshot, DatabaseManager(db_path))
+        print(f"Imported {header['nodes']} nodes and {header['edges']} edges into {db_path} in {time.perf_counter() - start:.1f}s.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import contextlib
+import io
+import pytest
+from backend.database import DatabaseManager
+from backend.orchestrator import RepositoryOrchestrator
+from benchmarks import synthetic
+
+# A small generated Python / JavaScript / TypeScript repository; call with write_repo
+# parameters to change its shape.
+@pytest.fixture
+def write_repo(tmp_path):
+    def write(**params):
+        root = tmp_path / "repo"
+        synthetic.write_repo(str(root), **{"files": 24, "functions": 5, **params})
+        return str(root)
+    return write
+
+@pytest.fixture
+def scan(tmp_path):
+    def run(repo, name, **options):
+        db = DatabaseManager(str(tmp_path / f"{name}.db"))
+        with contextlib.redirect_stdout(io.StringIO()): RepositoryOrchestrator(repo, db=db).scan(**options)
+        return db
+    return run
+
+# Everything a scan produces, minus the bookkeeping that legitimately differs between
+# two databases (versions and timestamps).
+def index_of(db):
+    nodes = sorted((r['id'], r['name'], r['type'], r['file_path'], r['start_line'], r['end_line'])
+                   for r in db.get_nodes_since(-1))
+    edges = sorted((r['source_id'], r['target_id'], r['type']) for r in db.get_edges())
+    return nodes, edges
+
+# Dependency and usage order follows the backend's adjacency order, which differs between
+# networkx and the CSR arrays of the compact and mapped graphs.
+def normalized(context):
+    if context is None: return None
+    target = {k: v for k, v in context['target'].items() if k not in ('last_updated', 'version')}
+    return {**context, 'target': target, 'dependencies': sorted(context['dependencies'], key=str),
+            'usages': sorted(context['usages'], key=str)}
@@ -0,0 +1,17 @@
+import pytest
+from backend.graph_service import GraphService
+from conftest import normalized
+
+def test_compact_contexts_match_networkx(write_repo, scan):
+    db = scan(write_repo(), "index")
+    reference = GraphService(db=db, cache_size=0)
+    compact = GraphService(db=db, backend="compact", cache_size=0)
+    ids = [r['id'] for r in db.get_function_index()]
+    assert ids
+    for node_id in ids:
+        assert normalized(compact.get_context_for_function(node_id)) == normalized(reference.get_context_for_function(node_id))
+        assert compact.get_reach(node_id) == reference.get_reach(node_id)
+
+def test_unknown_backend_is_rejected(write_repo, scan):
+    with pytest.raises(ValueError):
+        GraphService(db=scan(write_repo(files=4), "index"), backend="sparse")
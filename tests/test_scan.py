@@ -0,0 +1,55 @@
+import os
+from backend.orchestrator import RepositoryOrchestrator
+from conftest import index_of
+
+def test_incremental_rescan_matches_full_rebuild(write_repo, scan):
+    repo = write_repo()
+    db = scan(repo, "incremental")
+    os.remove(os.path.join(repo, "pkg_0", "mod_3.py"))
+    with open(os.path.join(repo, "pkg_0", "mod_6.py"), "a") as f:
+        f.write("\ndef m6_added(value):\n    return m6_f1(value)\n")
+    with open(os.path.join(repo, "pkg_0", "mod_1.js"), "w") as f:
+        f.write("export function m1_f0(value) { return m1_f9(value); }\n")
+    with open(os.path.join(repo, "pkg_0", "mod_9.py"), "a") as f:
+        f.write("\nfrom pkg_0.mod_6 import m6_added\n\ndef m9_added():\n    return m6_added(1)\n")
+    with open(os.path.join(repo, "pkg_0", "mod_12.py"), "a") as f:
+        f.write("\nfrom pkg_0.mod_15 import Widget\n\ndef make():\n    return Widget()\n")
+    scan(repo, "incremental")
+    # A constructor appearing later re-links the existing `Widget()` call.
+    with open(os.path.join(repo, "pkg_0", "mod_15.py"), "a") as f:
+        f.write("\nclass Widget:\n    def __init__(self):\n        self.ready = True\n")
+    scan(repo, "incremental")
+    full = index_of(scan(repo, "full", full=True))
+    assert ("pkg_0/mod_12.py::make", "pkg_0/mod_15.py::Widget.__init__", "calls") in full[1]
+    assert index_of(db) == full
+
+def test_unchanged_rescan_parses_nothing(write_repo, scan):
+    repo = write_repo()
+    before = index_of(scan(repo, "index"))
+    db = scan(repo, "index")
+    assert db.metrics.report()["counters"].get("files.parsed", 0) == 0
+    assert index_of(db) == before
+
+def test_parallel_scan_matches_serial(write_repo, scan):
+    repo = write_repo()
+    assert index_of(scan(repo, "parallel", workers=2)) == index_of(scan(repo, "serial"))
+
+def test_scan_commits_in_groups(write_repo, scan, monkeypatch):
+    repo = write_repo()
+    whole = index_of(scan(repo, "whole"))
+    monkeypatch.setattr("backend.orchestrator.SCAN_COMMIT_FILES", 5)
+    db = scan(repo, "grouped")
+    assert db.metrics.report()["stages"]["scan.index"]["calls"] == 5  # 24 files
+    assert index_of(db) == whole
+
+def test_update_survives_undecodable_and_vanished_files(write_repo, scan, monkeypatch):
+    repo = write_repo()
+    db = scan(repo, "index")
+    orchestrator = RepositoryOrchestrator(repo, db=db)
+    with open(os.path.join(repo, "pkg_0", "bad.py"), "wb") as f: f.write(b"x = '\xff'\n")
+    assert orchestrator.update({"pkg_0/bad.py"}) == set()
+    # Deleted after the change was seen but before it was read: handled as a delete.
+    def vanish(*args): raise FileNotFoundError(args[1])
+    monkeypatch.setattr("backend.orchestrator.load_file", vanish)
+    assert orchestrator.update({"pkg_0/mod_3.py"}) == {"pkg_0/mod_3.py"}
+    assert not db.get_file_nodes("pkg_0/mod_3.py")
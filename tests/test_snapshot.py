@@ -0,0 +1,28 @@
+from backend.database import DatabaseManager
+from backend.graph_service import GraphService
+from backend.snapshot import SnapshotStore, export_snapshot, import_snapshot
+from conftest import index_of, normalized
+
+def test_snapshot_round_trip_preserves_index(write_repo, scan, tmp_path):
+    db = scan(write_repo(), "index")
+    db.update_summaries([(r['id'], f"Summary of {r['name']}.") for r in db.get_function_index()[::3]])
+    path = str(tmp_path / "index.owlsnap")
+    export_snapshot(db, path)
+    restored = DatabaseManager(str(tmp_path / "restored.db"))
+    import_snapshot(path, restored)
+    assert index_of(restored) == index_of(db)
+    for r in db.get_function_index():
+        assert restored.get_node_code(r['id']) == db.get_node_code(r['id'])
+    summaries = lambda d: sorted((r['id'], r['summary']) for r in d.get_nodes_since(-1))
+    assert summaries(restored) == summaries(db)
+
+def test_mapped_contexts_match_networkx(write_repo, scan, tmp_path):
+    db = scan(write_repo(), "index")
+    path = str(tmp_path / "index.owlsnap")
+    export_snapshot(db, path)
+    reference = GraphService(db=db, cache_size=0)
+    mapped = GraphService(db=SnapshotStore(path), backend="mapped", cache_size=0)
+    for r in db.get_function_index():
+        assert normalized(mapped.get_context_for_function(r['id'])) == normalized(reference.get_context_for_function(r['id']))
+        assert mapped.get_reach(r['id']) == reference.get_reach(r['id'])
+    assert mapped.get_context_for_function("missing.py::nothing") is None
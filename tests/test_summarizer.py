@@ -0,0 +1,31 @@
+from backend.database import DatabaseManager
+from backend.summarizer import SummaryEngine
+
+class EchoAI:
+    def summarize_function(self, code, name, raise_errors=False):
+        return f"Summary of {name}."
+
+def test_stats_are_per_run(tmp_path):
+    db = DatabaseManager(str(tmp_path / "index.db"))
+    engine = SummaryEngine(EchoAI(), db, rate=0)
+    nodes = [{"id": f"m.py::f{i}", "name": f"f{i}", "code": f"def f{i}(): return {i}"} for i in range(3)]
+    assert engine.run(nodes[:2])["summarized"] == 2
+    assert engine.run(nodes[2:])["summarized"] == 1
+    assert db.metrics.report()["counters"]["summaries.summarized"] == 3
+
+class FlakyAI:
+    def __init__(self):
+        self.calls = 0
+
+    def summarize_function(self, code, name, raise_errors=False):
+        self.calls += 1
+        if self.calls == 1: raise ConnectionError("reset")
+        return f"Summary of {name}."
+
+def test_latency_excludes_backoff(tmp_path):
+    db = DatabaseManager(str(tmp_path / "index.db"))
+    engine = SummaryEngine(FlakyAI(), db, rate=0, backoff=0.2)
+    stats = engine.run([{"id": "m.py::f", "name": "f", "code": "def f(): pass"}])
+    assert stats["summarized"] == 1 and stats["retries"] == 1
+    latency = db.metrics.report()["latency"]["ai.latency"]
+    assert latency["count"] == 2 and latency["max"] < 0.1